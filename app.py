@@ -1,22 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
 from datetime import datetime
+import math
 import os
+import re
+from pathlib import Path
+import shutil
+from statistics import NormalDist
+from typing import NamedTuple
 from dotenv import load_dotenv
 
 # Import custom modules
 from database.db_handler import DatabaseHandler
-from rag.document_processor import DocumentProcessor
-from rag.query_engine import QueryEngine
 from models.inventory import InventoryManager
 from models.order import OrderManager
 from models.product import ProductManager
 
-from rag.rag_handler import RAGHandler
-
 # Load environment variables
 load_dotenv()
 
@@ -31,152 +33,641 @@ st.set_page_config(
 # Initialize session state
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
-if "current_page" not in st.session_state:
-    st.session_state.current_page = "Home"
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 
-# Database connection
-db = DatabaseHandler()
+# Database connection, shared by every session in the process
+@st.cache_resource
+def get_db():
+    return DatabaseHandler()
+
+# Initialize managers on top of the shared handler
+@st.cache_resource
+def get_managers():
+    shared_db = get_db()
+    return InventoryManager(shared_db), OrderManager(shared_db), ProductManager(shared_db)
+
+db = get_db()
+inventory_manager, order_manager, product_manager = get_managers()
+
+# RAG components are imported and built lazily, once per process: the embedding
+# stack is slow to load and most pages never touch it
+@st.cache_resource
+def get_rag_handler():
+    from rag.rag_handler import RAGHandler
+    return RAGHandler(mock=False, api_key=os.environ.get("PINECONE_API_KEY"))  # Use actual Pinecone
+
+@st.cache_resource
+def get_document_processor():
+    from rag.document_processor import DocumentProcessor
+    return DocumentProcessor()
+
+@st.cache_resource
+def get_query_engine():
+    from rag.query_engine import QueryEngine
+    # Share the cached handler rather than opening a second Pinecone client
+    return QueryEngine(rag_handler=get_rag_handler())
+
+# The document library is a Pinecone scan; reuse it across reruns briefly
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_documents():
+    return get_rag_handler().get_all_documents_df()
+
+# Sample data for demonstration, shared across reruns
+@dataclass(frozen=True, slots=True)
+class OrderableProduct:
+    id: str
+    name: str
+    price: float
+    available: int
+
+@dataclass(frozen=True, slots=True)
+class OrderedItem:
+    id: str
+    name: str
+    price: float
+    current_qty: int
+
+@dataclass(frozen=True, slots=True)
+class DeliveryUpdate:
+    order_id: str
+    customer: str
+    status: str
+    estimated_delivery: str
+
+ORDERABLE_PRODUCTS = (
+    OrderableProduct("P001", "Product A", 100, 50),
+    OrderableProduct("P002", "Product B", 150, 30),
+    OrderableProduct("P003", "Product C", 200, 20),
+    OrderableProduct("P004", "Product D", 120, 40),
+    OrderableProduct("P005", "Product E", 180, 25)
+)
+
+ORDERED_ITEMS = (
+    OrderedItem("P001", "Product A", 100, 2),
+    OrderedItem("P003", "Product C", 200, 1)
+)
+
+DELIVERY_UPDATES = (
+    DeliveryUpdate("ORD-12345", "John Doe", "Out for Delivery", "Today, 2:00 PM"),
+    DeliveryUpdate("ORD-12346", "Jane Smith", "Delayed", "Tomorrow, 10:00 AM"),
+    DeliveryUpdate("ORD-12347", "Robert Johnson", "Delivered", "Delivered on July 14, 3:45 PM"),
+    DeliveryUpdate("ORD-12348", "Emily Davis", "In Transit", "July 17, 12:00 PM"),
+    DeliveryUpdate("ORD-12349", "Michael Wilson", "Processing", "July 18, 2:00 PM")
+)
+
+# JIT implementation status as (category, score) pairs
+JIT_STATUS = (
+    ("Supplier Integration", 85),
+    ("Production Scheduling", 92),
+    ("Quality Control", 78),
+    ("Delivery Optimization", 65),
+    ("Staff Training", 90)
+)
+
+HOME_METRICS = (
+    ("152", "Active Orders"),
+    ("98.2%", "On-Time Delivery"),
+    ("87%", "Inventory Accuracy"),
+    ("$1.2M", "Monthly Revenue"),
+)
+
+# Sample product catalog
+PRODUCTS_DF = pd.DataFrame([
+    {"id": "P001", "name": "Smartphone X", "category": "Electronics", "price": 699.99, "stock": 45, "status": "In Stock"},
+    {"id": "P002", "name": "Laptop Pro", "category": "Electronics", "price": 1299.99, "stock": 20, "status": "In Stock"},
+    {"id": "P003", "name": "Wireless Earbuds", "category": "Electronics", "price": 129.99, "stock": 8, "status": "Low Stock"},
+    {"id": "P004", "name": "Cotton T-Shirt", "category": "Clothing", "price": 19.99, "stock": 150, "status": "In Stock"},
+    {"id": "P005", "name": "Denim Jeans", "category": "Clothing", "price": 49.99, "stock": 75, "status": "In Stock"},
+    {"id": "P006", "name": "Coffee Maker", "category": "Home Goods", "price": 89.99, "stock": 0, "status": "Out of Stock"},
+    {"id": "P007", "name": "Blender", "category": "Home Goods", "price": 69.99, "stock": 12, "status": "In Stock"},
+    {"id": "P008", "name": "Organic Coffee", "category": "Food & Beverage", "price": 12.99, "stock": 30, "status": "In Stock"},
+    {"id": "P009", "name": "Notebook Set", "category": "Office Supplies", "price": 15.99, "stock": 5, "status": "Low Stock"},
+    {"id": "P010", "name": "Desk Lamp", "category": "Home Goods", "price": 34.99, "stock": 18, "status": "In Stock"}
+])
 
-# Initialize managers
-inventory_manager = InventoryManager(db)
-order_manager = OrderManager(db)
-product_manager = ProductManager(db)
+# Lowercased search columns, so a product search only lowercases the query
+PRODUCT_NAMES_LOWER = PRODUCTS_DF["name"].str.lower()
+PRODUCT_IDS_LOWER = PRODUCTS_DF["id"].str.lower()
 
-# Initialize RAG components
-document_processor = DocumentProcessor()
-query_engine = QueryEngine()
+# Service level (%) -> Z-score (inverse normal CDF) for every slider value
+Z_SCORES = {level: NormalDist().inv_cdf(level / 100) for level in range(80, 100)}
+
+# Plotly config for dashboard charts that need no hover/zoom handlers
+STATIC_PLOT_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+# Sample analytics data
+REVENUE_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul")
+MONTHLY_REVENUE = np.array([980000, 1050000, 920000, 1100000, 1150000, 1250000, 1200000], dtype=np.int64)
+
+ORDER_STATUSES = ("Delivered", "In Transit", "Processing", "Delayed", "Cancelled")
+ORDER_STATUS_COUNTS = np.array([450, 120, 80, 30, 20], dtype=np.int64)
+
+INVENTORY_STATUSES = ("Optimal", "Low Stock", "Overstock", "Out of Stock")
+INVENTORY_STATUS_COUNTS = np.array([650, 150, 100, 50], dtype=np.int64)
+
+CATEGORIES = ("Electronics", "Clothing", "Home Goods", "Food & Beverage", "Office Supplies")
+CATEGORY_SALES = np.array([450000, 320000, 280000, 100000, 50000], dtype=np.int64)
+CATEGORY_GROWTH = np.array([12.5, 8.2, 15.3, 5.7, -2.1])
+
+PERFORMANCE_METRICS = (
+    ("Perfect Order Rate", 92.5),
+    ("Order Cycle Time", 85.3),
+    ("Inventory Accuracy", 96.8),
+    ("Supplier On-Time Delivery", 89.2),
+    ("Backorder Rate", 78.6),
+    ("Fill Rate", 94.3)
+)
+
+# Canned assistant replies, keyed by the first topic keyword in the message
+CHAT_INTENT_RE = re.compile(r"(inventory|order|supplier|analytics)", re.IGNORECASE)
+CHAT_INTENT_RESPONSES = {
+    "inventory": "Based on our current inventory data, we have 987 SKUs in stock, 152 items are running low, and 106 items are out of stock. The overall inventory accuracy is at 87%, which is slightly below our target of 90%. Would you like me to provide more specific information about a particular product category?",
+    "order": "We currently have 152 active orders in the system. 120 are on schedule for delivery, 25 are in processing, and 7 are experiencing delays due to supplier issues. The on-time delivery rate is 98.2% for this month, which is above our target of 95%. Is there a specific order you'd like to know more about?",
+    "supplier": "We work with 45 active suppliers. Our top-performing supplier is ABC Electronics with a 99.5% on-time delivery rate. We're currently experiencing delays with XYZ Manufacturing, affecting some of our electronic components. Would you like me to provide a full supplier performance report?",
+    "analytics": "Our latest analytics show a revenue increase of 8.5% compared to last month. The best-performing product category is Electronics with a 12.5% growth rate. Our inventory turnover has improved to 5.3 times per year. Would you like me to generate a detailed analytics report for a specific time period?"
+}
+CHAT_DEFAULT_RESPONSE = "I'm your supply chain assistant, ready to help with inventory management, order tracking, supplier information, and analytics. You can ask me about current inventory levels, order status, supplier performance, or request analytics reports. How can I assist you today?"
+
+# Fallback document library shown when the RAG store is unavailable
+SAMPLE_DOCUMENTS_DF = pd.DataFrame([
+    {"name": "Supplier Performance Q2 2023.pdf", "type": "PDF", "uploaded": "2023-07-10", "size": "2.4 MB"},
+    {"name": "Inventory Analysis June 2023.xlsx", "type": "Excel", "uploaded": "2023-07-05", "size": "1.8 MB"},
+    {"name": "Logistics Cost Report.docx", "type": "Word", "uploaded": "2023-06-28", "size": "950 KB"},
+    {"name": "Warehouse Optimization Plan.pdf", "type": "PDF", "uploaded": "2023-06-15", "size": "3.2 MB"},
+    {"name": "Supplier Contracts 2023.pdf", "type": "PDF", "uploaded": "2023-06-01", "size": "5.1 MB"}
+])
+
+# Static tables are built once at import, with explicit dtypes so the Arrow
+# payload sent to the browser stays small
+RECENT_ACTIVITIES_DF = pd.DataFrame([
+    {"timestamp": "2023-07-15 09:23", "activity": "Order #12345 shipped to customer", "status": "Completed"},
+    {"timestamp": "2023-07-15 08:45", "activity": "Inventory restocked: SKU-789", "status": "Completed"},
+    {"timestamp": "2023-07-14 17:30", "activity": "New order #12346 received", "status": "Processing"},
+    {"timestamp": "2023-07-14 14:15", "activity": "Supplier delivery delayed", "status": "Alert"},
+    {"timestamp": "2023-07-14 10:00", "activity": "ABC Analysis completed", "status": "Completed"}
+]).astype({"timestamp": "datetime64[ns]", "status": "category"})
+
+MOVEMENTS_DF = pd.DataFrame([
+    {"timestamp": "2023-07-15 09:30", "sku": "SKU-001", "product": "Product A", "type": "Inbound", "quantity": 50},
+    {"timestamp": "2023-07-15 08:45", "sku": "SKU-002", "product": "Product B", "type": "Outbound", "quantity": 25},
+    {"timestamp": "2023-07-14 16:20", "sku": "SKU-003", "product": "Product C", "type": "Inbound", "quantity": 100},
+    {"timestamp": "2023-07-14 14:15", "sku": "SKU-004", "product": "Product D", "type": "Outbound", "quantity": 30},
+    {"timestamp": "2023-07-14 10:00", "sku": "SKU-005", "product": "Product E", "type": "Adjustment", "quantity": -5}
+]).astype({"timestamp": "datetime64[ns]", "type": "category"})
+
+DELIVERY_UPDATES_DF = pd.DataFrame(
+    [asdict(update) for update in DELIVERY_UPDATES]
+).astype({"status": "category"})
+
+# ABC category summary (item count, total value, share of total value)
+class ABCStats(NamedTuple):
+    items: int
+    value: float
+    percentage: str
+
+# Sample ABC analysis data, in A/B/C order
+ABC_SAMPLE_DATA = (
+    ABCStats(125, 850000, "75%"),
+    ABCStats(350, 230000, "20%"),
+    ABCStats(770, 57000, "5%")
+)
+
+ABC_MANAGEMENT_NOTES = {
+    "A": "Tight control, accurate records, frequent review",
+    "B": "Regular review, normal controls",
+    "C": "Simplest controls, bulk ordering, safety stock"
+}
+
+def _abc_card_html(category, stats):
+    # Stripped so several cards can be joined into one HTML block without blank lines
+    return f"""
+    <div class='card'>
+        <h3>{category} Items</h3>
+        <p><strong>Count:</strong> {stats.items}</p>
+        <p><strong>Value:</strong> ${stats.value:,}</p>
+        <p><strong>% of Total Value:</strong> {stats.percentage}</p>
+        <p><strong>Management:</strong> {ABC_MANAGEMENT_NOTES[category]}</p>
+    </div>
+    """.strip()
+
+def _metrics_row(metrics):
+    # One grid block for a row of (value, label) metric cards
+    cards = "".join(
+        f"<div class='metric-card'><div class='metric-value'>{value}</div>"
+        f"<div class='metric-label'>{label}</div></div>"
+        for value, label in metrics
+    )
+    return f"<div class='metric-grid'>{cards}</div>"
+
+def _source_name(source):
+    md = source.get('metadata', {})
+    return md.get('file_name') or md.get('filename') or 'Unknown Document'
+
+def _paginated_dataframe(df, key, page_size=50):
+    # Only ship one page of rows to the browser at a time
+    if len(df) <= page_size:
+        st.dataframe(df, width='stretch')
+        return
+    page_count = (len(df) - 1) // page_size + 1
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size], width='stretch')
+
+# Cached inventory lookups (Streamlit reruns the whole script on every interaction)
+@st.cache_data(ttl=60)
+def _cached_abc():
+    return inventory_manager.perform_abc_analysis()
+
+@st.cache_data(ttl=60)
+def _cached_inventory_frame():
+    # Products joined with their inventory rows, indexed by product id, with the
+    # per-item value (price * quantity) precomputed
+    products = pd.DataFrame(product_manager.get_all_products())
+    inventory = pd.DataFrame(inventory_manager.get_all_inventory())
+    if products.empty or inventory.empty:
+        return pd.DataFrame(
+            columns=["name", "quantity", "price", "value"], index=pd.Index([], name="id")
+        )
+    # One row per product id, so the index stays unique for reindex/loc
+    joined = products.drop_duplicates("id").merge(
+        inventory.drop_duplicates("product_id"), left_on="id", right_on="product_id", how="inner"
+    )
+    joined["value"] = joined["price"].astype("float32") * joined["quantity"].astype("float32")
+    return joined.set_index("id")[["name", "quantity", "price", "value"]]
+
+@st.cache_data(ttl=60)
+def _cached_jit_candidates():
+    return inventory_manager.get_jit_candidates()
+
+def _invalidate_inventory_cache():
+    _cached_abc.clear()
+    _cached_inventory_frame.clear()
+    _cached_jit_candidates.clear()
 
 # Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1E88E5;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .sub-header {
-        font-size: 1.5rem;
-        color: #0D47A1;
-        margin-bottom: 1rem;
-    }
-    .card {
-        background-color: #f9f9f9;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        margin-bottom: 20px;
-    }
-    .metric-card {
-        background-color: #e3f2fd;
-        border-radius: 10px;
-        padding: 15px;
-        text-align: center;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    .metric-value {
-        font-size: 2rem;
-        font-weight: bold;
-        color: #1565C0;
-    }
-    .metric-label {
-        font-size: 1rem;
-        color: #424242;
-    }
-    .chat-message {
-        padding: 10px;
-        border-radius: 10px;
-        margin-bottom: 10px;
-        display: flex;
-    }
-    .user-message {
-        background-color: #e3f2fd;
-        margin-left: 20%;
-    }
-    .bot-message {
-        background-color: #f1f1f1;
-        margin-right: 20%;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def _inject_css():
+    css = (Path(__file__).parent / "assets" / "styles.css").read_text()
+    return f"<style>\n{css}</style>"
+
+st.markdown(_inject_css(), unsafe_allow_html=True)
+
+# Cached figure builders (figures are rebuilt and re-serialized on every rerun otherwise)
+@st.cache_data(show_spinner=False)
+def _build_abc_fig(counts, values, title, value_label):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    
+    # Add bars
+    fig.add_trace(go.Bar(
+        x=["A", "B", "C"],
+        y=list(counts),
+        name="Number of Items",
+        marker_color=["#1E88E5", "#42A5F5", "#90CAF9"]
+    ))
+    
+    # Add value line
+    fig.add_trace(go.Scatter(
+        x=["A", "B", "C"],
+        y=list(values),
+        name=value_label,
+        yaxis="y2",
+        line=dict(color="#0D47A1", width=4)
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        title=title,
+        xaxis_title="Category",
+        yaxis_title="Number of Items",
+        yaxis2=dict(
+            title=value_label,
+            overlaying="y",
+            side="right"
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_eoq_fig(eoq, annual_demand, order_cost, holding_cost):
+    import plotly.graph_objects as go
+
+    order_sizes = np.arange(max(1, eoq - 100), eoq + 100, 10, dtype=np.float32)
+    order_costs = (annual_demand / order_sizes) * order_cost
+    holding_costs = (order_sizes / 2) * holding_cost
+    total_costs = order_costs + holding_costs
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=order_sizes,
+        y=order_costs,
+        mode="lines",
+        name="Order Cost",
+        line=dict(color="#42A5F5", width=2)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=order_sizes,
+        y=holding_costs,
+        mode="lines",
+        name="Holding Cost",
+        line=dict(color="#FF7043", width=2)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=order_sizes,
+        y=total_costs,
+        mode="lines",
+        name="Total Cost",
+        line=dict(color="#66BB6A", width=3)
+    ))
+
+    # Add vertical line at EOQ
+    fig.add_vline(x=eoq, line_dash="dash", line_color="#E91E63")
+
+    fig.update_layout(
+        title="Cost vs. Order Quantity",
+        xaxis_title="Order Quantity",
+        yaxis_title="Cost ($)",
+        annotations=[
+            dict(
+                x=eoq,
+                y=float(total_costs.min()) * 1.1,
+                text=f"EOQ = {eoq}",
+                showarrow=True,
+                arrowhead=1,
+                ax=0,
+                ay=-40
+            )
+        ]
+    )
+    return fig
+
+def _simulate_inventory(actual_demand, reorder_point, restock_level):
+    # Each day's level drops by the previous day's demand and is restocked to
+    # restock_level once it reaches the reorder point. Demand is non-negative,
+    # so cumulative consumption is sorted and each restock day is a bisection;
+    # the levels themselves are computed in one vectorized pass.
+    days = len(actual_demand)
+    consumed = np.concatenate(([0.0], np.cumsum(actual_demand[:-1])))
+    consumed_list = consumed.tolist()
+    threshold = restock_level - reorder_point
+    restock_days = []
+    day = 0
+    while day < days:
+        restock_days.append(day)
+        day = max(bisect_left(consumed_list, consumed_list[day] + threshold), day + 1)
+    last_restock = np.zeros(days, dtype=np.intp)
+    last_restock[restock_days] = restock_days
+    last_restock = np.maximum.accumulate(last_restock)
+    return restock_level - (consumed - consumed[last_restock])
+
+@st.cache_data(show_spinner=False)
+def _build_safety_stock_fig(avg_daily_demand, std_dev_demand, reorder_point, safety_stock, days=30, seed=42):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Generate time series data
+    x = list(range(1, days + 1))
+
+    # Actual demand with some randomness
+    rng = np.random.default_rng(seed)  # For reproducibility
+    actual_demand = np.maximum(0.0, rng.normal(avg_daily_demand, std_dev_demand, days))
+
+    # Inventory level simulation, restocking to reorder point + some buffer
+    inventory = _simulate_inventory(actual_demand, reorder_point, reorder_point + 500)
+
+    # Plot inventory level
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=inventory,
+        mode="lines",
+        name="Inventory Level",
+        line=dict(color="#1E88E5", width=3)
+    ))
+
+    # Add actual demand
+    fig.add_trace(go.Bar(
+        x=x,
+        y=actual_demand,
+        name="Daily Demand",
+        marker_color="#90CAF9"
+    ))
+
+    # Add reorder point line
+    fig.add_hline(
+        y=reorder_point,
+        line_dash="dash",
+        line_color="#E91E63",
+        annotation_text="Reorder Point",
+        annotation_position="bottom right"
+    )
+
+    # Add safety stock line
+    fig.add_hline(
+        y=safety_stock,
+        line_dash="dash",
+        line_color="#FF7043",
+        annotation_text="Safety Stock",
+        annotation_position="bottom left"
+    )
+
+    fig.update_layout(
+        title="Inventory Level Simulation with Safety Stock",
+        xaxis_title="Day",
+        yaxis_title="Units",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+# Analytics figures are cached on their data so reruns reuse them
+@st.cache_data(show_spinner=False)
+def _build_revenue_fig(months, revenue):
+    import plotly.express as px
+
+    fig = px.line(
+        x=months,
+        y=revenue,
+        labels={"x": "Month", "y": "Revenue ($)"},
+        markers=True
+    )
+    
+    fig.update_traces(line_color="#1E88E5", line_width=3)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_order_status_fig(order_statuses, order_counts):
+    import plotly.express as px
+
+    fig = px.pie(
+        names=order_statuses,
+        values=order_counts,
+        hole=0.4,
+        color_discrete_sequence=px.colors.sequential.Blues
+    )
+    
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_inventory_status_fig(inventory_statuses, inventory_counts):
+    import plotly.express as px
+
+    return px.bar(
+        x=inventory_statuses,
+        y=inventory_counts,
+        color=inventory_counts,
+        color_continuous_scale="Blues",
+        labels={"x": "Status", "y": "Number of SKUs"}
+    )
+
+@st.cache_data(show_spinner=False)
+def _build_category_fig(categories, sales, growth):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=categories,
+        y=sales,
+        name="Sales ($)",
+        marker_color="#42A5F5"
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=categories,
+        y=growth,
+        name="Growth (%)",
+        mode="markers+lines",
+        marker=dict(size=12, color="#E91E63"),
+        line=dict(color="#E91E63", width=2),
+        yaxis="y2"
+    ))
+    
+    fig.update_layout(
+        xaxis_title="Category",
+        yaxis_title="Sales ($)",
+        yaxis2=dict(
+            title="Growth (%)",
+            overlaying="y",
+            side="right",
+            range=[-5, 20]
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_performance_fig(metrics):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Arrange indicators in 2 rows x 3 columns to avoid overlap
+    metrics = dict(metrics)
+    metric_names = list(metrics.keys())
+    cols = 3
+    rows = 2
+    for idx, name in enumerate(metric_names):
+        r, c = divmod(idx, cols)
+        value = metrics[name]
+        fig.add_trace(go.Indicator(
+            mode="gauge+number",
+            value=value,
+            title={"text": name},
+            domain={"row": r, "column": c},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "#1E88E5"},
+                "steps": [
+                    {"range": [0, 60], "color": "#FFCDD2"},
+                    {"range": [60, 80], "color": "#FFECB3"},
+                    {"range": [80, 100], "color": "#C8E6C9"}
+                ]
+            }
+        ))
+
+    fig.update_layout(
+        grid={"rows": rows, "columns": cols, "pattern": "independent"},
+        height=600,
+        margin=dict(t=40, b=40, l=20, r=20)
+    )
+    return fig
+
+# The JIT gauge is built from constant data, so one figure serves the whole process
+@st.cache_resource
+def _jit_status_fig(status):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    for column, (category, value) in enumerate(status):
+        fig.add_trace(go.Indicator(
+            mode="gauge+number",
+            value=value,
+            title={"text": category},
+            domain={"row": 0, "column": column},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "#1E88E5"},
+                "steps": [
+                    {"range": [0, 50], "color": "#FFCDD2"},
+                    {"range": [50, 80], "color": "#FFECB3"},
+                    {"range": [80, 100], "color": "#C8E6C9"}
+                ]
+            }
+        ))
+
+    fig.update_layout(
+        grid={"rows": 1, "columns": len(status)},
+        height=250
+    )
+    return fig
 
 # Sidebar navigation
-def sidebar():
+def sidebar(pages):
     with st.sidebar:
         st.image("assets/logo.svg", width=200)
         st.title("Navigation")
         
-        # Navigation options
-        pages = {
-            "Home": "🏠",
-            "Order Management": "📦",
-            "Inventory Management": "🧮",
-            "Products": "🛒",
-            "Analytics": "📊",
-            "Supply Chain Assistant": "🤖",
-            "Document Upload": "📄"
-        }
-        
-        for page, icon in pages.items():
-            if st.button(f"{icon} {page}"):
-                st.session_state.current_page = page
-                st.rerun()
+        # Page links let st.navigation switch pages; only the selected page runs
+        for page in pages:
+            st.page_link(page)
 
 # Page rendering functions
 def home_page():
     st.markdown("<h1 class='main-header'>Supply Chain Management System</h1>", unsafe_allow_html=True)
     
     # Overview metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown("""
-        <div class='metric-card'>
-            <div class='metric-value'>152</div>
-            <div class='metric-label'>Active Orders</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class='metric-card'>
-            <div class='metric-value'>98.2%</div>
-            <div class='metric-label'>On-Time Delivery</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class='metric-card'>
-            <div class='metric-value'>87%</div>
-            <div class='metric-label'>Inventory Accuracy</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class='metric-card'>
-            <div class='metric-value'>$1.2M</div>
-            <div class='metric-label'>Monthly Revenue</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_metrics_row(HOME_METRICS), unsafe_allow_html=True)
     
     # Recent activity
     st.markdown("<h2 class='sub-header'>Recent Activity</h2>", unsafe_allow_html=True)
     
-    # Sample data for demonstration
-    recent_activities = [
-        {"timestamp": "2023-07-15 09:23", "activity": "Order #12345 shipped to customer", "status": "Completed"},
-        {"timestamp": "2023-07-15 08:45", "activity": "Inventory restocked: SKU-789", "status": "Completed"},
-        {"timestamp": "2023-07-14 17:30", "activity": "New order #12346 received", "status": "Processing"},
-        {"timestamp": "2023-07-14 14:15", "activity": "Supplier delivery delayed", "status": "Alert"},
-        {"timestamp": "2023-07-14 10:00", "activity": "ABC Analysis completed", "status": "Completed"}
-    ]
-    
-    activity_df = pd.DataFrame(recent_activities)
-    st.dataframe(activity_df, width='stretch')
+    st.dataframe(RECENT_ACTIVITIES_DF, width='stretch')
     
     # Quick actions
     st.markdown("<h2 class='sub-header'>Quick Actions</h2>", unsafe_allow_html=True)
@@ -215,24 +706,15 @@ def order_management_page():
             # Product selection
             st.subheader("Select Products")
             
-            # Sample product data
-            products = [
-                {"id": "P001", "name": "Product A", "price": 100, "available": 50},
-                {"id": "P002", "name": "Product B", "price": 150, "available": 30},
-                {"id": "P003", "name": "Product C", "price": 200, "available": 20},
-                {"id": "P004", "name": "Product D", "price": 120, "available": 40},
-                {"id": "P005", "name": "Product E", "price": 180, "available": 25}
-            ]
-            
             selected_products = {}
-            for product in products:
+            for product in ORDERABLE_PRODUCTS:
                 col1, col2 = st.columns([3, 1])
                 with col1:
-                    st.write(f"{product['name']} - ${product['price']} (Available: {product['available']})")
+                    st.write(f"{product.name} - ${product.price} (Available: {product.available})")
                 with col2:
-                    quantity = st.number_input(f"Qty for {product['name']}", min_value=0, max_value=product['available'], step=1, key=f"qty_{product['id']}")
+                    quantity = st.number_input(f"Qty for {product.name}", min_value=0, max_value=product.available, step=1, key=f"qty_{product.id}")
                     if quantity > 0:
-                        selected_products[product['id']] = quantity
+                        selected_products[product.id] = quantity
             
             shipping_address = st.text_area("Shipping Address")
             delivery_date = st.date_input("Expected Delivery Date")
@@ -303,18 +785,12 @@ def order_management_page():
                 new_address = st.text_area("New Delivery Address")
             elif update_type == "Modify Order Items":
                 st.write("Select products to modify:")
-                # Sample product data
-                products = [
-                    {"id": "P001", "name": "Product A", "price": 100, "current_qty": 2},
-                    {"id": "P003", "name": "Product C", "price": 200, "current_qty": 1}
-                ]
-                
-                for product in products:
+                for product in ORDERED_ITEMS:
                     col1, col2 = st.columns([3, 1])
                     with col1:
-                        st.write(f"{product['name']} - ${product['price']} (Current Qty: {product['current_qty']})")
+                        st.write(f"{product.name} - ${product.price} (Current Qty: {product.current_qty})")
                     with col2:
-                        st.number_input(f"New Qty for {product['name']}", min_value=0, value=product['current_qty'], step=1, key=f"update_qty_{product['id']}")
+                        st.number_input(f"New Qty for {product.name}", min_value=0, value=product.current_qty, step=1, key=f"update_qty_{product.id}")
             elif update_type == "Cancel Order":
                 cancellation_reason = st.text_area("Reason for Cancellation")
             
@@ -328,17 +804,7 @@ def order_management_page():
     with tab4:
         st.subheader("Delivery Updates")
         
-        # Sample delivery updates
-        delivery_updates = [
-            {"order_id": "ORD-12345", "customer": "John Doe", "status": "Out for Delivery", "estimated_delivery": "Today, 2:00 PM"},
-            {"order_id": "ORD-12346", "customer": "Jane Smith", "status": "Delayed", "estimated_delivery": "Tomorrow, 10:00 AM"},
-            {"order_id": "ORD-12347", "customer": "Robert Johnson", "status": "Delivered", "estimated_delivery": "Delivered on July 14, 3:45 PM"},
-            {"order_id": "ORD-12348", "customer": "Emily Davis", "status": "In Transit", "estimated_delivery": "July 17, 12:00 PM"},
-            {"order_id": "ORD-12349", "customer": "Michael Wilson", "status": "Processing", "estimated_delivery": "July 18, 2:00 PM"}
-        ]
-        
-        delivery_df = pd.DataFrame(delivery_updates)
-        st.dataframe(delivery_df, width='stretch')
+        st.dataframe(DELIVERY_UPDATES_DF, width='stretch')
         
         # Send delivery update
         st.write("### Send Delivery Update")
@@ -354,7 +820,74 @@ def order_management_page():
                 else:
                     st.error("Please enter an Order ID")
 
+# Fragments rerun on their own (and every minute), so widget interactions
+# elsewhere on the page don't re-run these DB-bound sections
+@st.fragment(run_every=60)
+def _live_abc_fragment():
+    st.markdown("### Live ABC Analysis")
+    if st.button("Invalidate", key="invalidate_abc_cache"):
+        _invalidate_inventory_cache()
+    try:
+        abc_result = _cached_abc()
+        joined = _cached_inventory_frame()
+
+        def compute_category_stats(ids):
+            return len(ids), float(joined["value"].reindex(ids).sum())
+
+        category_stats = [compute_category_stats(abc_result.get(cat, [])) for cat in ("A", "B", "C")]
+        total_value = max(sum(value for _, value in category_stats), 1e-9)
+        live_data = tuple(
+            ABCStats(count, value, f"{(value/total_value)*100:.1f}%")
+            for count, value in category_stats
+        )
+
+        fig_live = _build_abc_fig(
+            tuple(s.items for s in live_data),
+            tuple(s.value for s in live_data),
+            "Live ABC Analysis",
+            "Category Value ($)"
+        )
+        st.plotly_chart(fig_live, width='stretch')
+
+        st.subheader("Items by ABC Category (Live)")
+        for cat in ["A", "B", "C"]:
+            # Keep the ABC ordering (highest value first) and skip unknown ids
+            ids = pd.Index(abc_result.get(cat, [])).intersection(joined.index, sort=False)
+            rows = joined.loc[ids].rename_axis("Product ID").reset_index().rename(columns={
+                "name": "Product",
+                "quantity": "Quantity",
+                "price": "Price",
+                "value": "Value"
+            }).astype({
+                "Product ID": "category",
+                "Product": "category",
+                "Quantity": "int32",
+                "Price": "float32",
+                "Value": "float32"
+            })
+            st.markdown(f"#### Category {cat}")
+            if not rows.empty:
+                _paginated_dataframe(rows, key=f"abc_page_{cat}")
+            else:
+                st.info("No items in this category.")
+    except Exception as e:
+        st.error(f"Failed to perform live ABC analysis: {e}")
+
+@st.fragment(run_every=60)
+def _jit_candidates_fragment():
+    try:
+        jit_candidates = _cached_jit_candidates()
+        if jit_candidates:
+            jit_df = pd.DataFrame(jit_candidates)
+            st.dataframe(jit_df, width='stretch')
+        else:
+            st.info("No JIT candidates identified.")
+    except Exception as e:
+        st.error(f"Failed to load JIT candidates: {e}")
+
 def inventory_management_page():
+    import plotly.express as px
+
     st.markdown("<h1 class='main-header'>Inventory Management</h1>", unsafe_allow_html=True)
     
     # Tabs for different inventory functions
@@ -394,17 +927,7 @@ def inventory_management_page():
         # Recent inventory movements
         st.subheader("Recent Inventory Movements")
         
-        # Sample data
-        movements = [
-            {"timestamp": "2023-07-15 09:30", "sku": "SKU-001", "product": "Product A", "type": "Inbound", "quantity": 50},
-            {"timestamp": "2023-07-15 08:45", "sku": "SKU-002", "product": "Product B", "type": "Outbound", "quantity": 25},
-            {"timestamp": "2023-07-14 16:20", "sku": "SKU-003", "product": "Product C", "type": "Inbound", "quantity": 100},
-            {"timestamp": "2023-07-14 14:15", "sku": "SKU-004", "product": "Product D", "type": "Outbound", "quantity": 30},
-            {"timestamp": "2023-07-14 10:00", "sku": "SKU-005", "product": "Product E", "type": "Adjustment", "quantity": -5}
-        ]
-        
-        movements_df = pd.DataFrame(movements)
-        st.dataframe(movements_df, width='stretch')
+        st.dataframe(MOVEMENTS_DF, width='stretch')
     
     with tab2:
         st.subheader("ABC Analysis")
@@ -418,163 +941,26 @@ def inventory_management_page():
         """)
         
         # Sample ABC analysis data
-        abc_data = {
-            "A": {"items": 125, "value": 850000, "percentage": "75%"},
-            "B": {"items": 350, "value": 230000, "percentage": "20%"},
-            "C": {"items": 770, "value": 57000, "percentage": "5%"}
-        }
-        
         # ABC Analysis visualization
-        fig = go.Figure()
-        
-        # Add bars
-        fig.add_trace(go.Bar(
-            x=["A", "B", "C"],
-            y=[abc_data["A"]["items"], abc_data["B"]["items"], abc_data["C"]["items"]],
-            name="Number of Items",
-            marker_color=["#1E88E5", "#42A5F5", "#90CAF9"]
-        ))
-        
-        # Add value line
-        fig.add_trace(go.Scatter(
-            x=["A", "B", "C"],
-            y=[abc_data["A"]["value"]/1000, abc_data["B"]["value"]/1000, abc_data["C"]["value"]/1000],
-            name="Value (thousands $)",
-            yaxis="y2",
-            line=dict(color="#0D47A1", width=4)
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            title="ABC Analysis Overview",
-            xaxis_title="Category",
-            yaxis_title="Number of Items",
-            yaxis2=dict(
-                title="Value (thousands $)",
-                overlaying="y",
-                side="right"
-            ),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
+        fig = _build_abc_fig(
+            tuple(s.items for s in ABC_SAMPLE_DATA),
+            tuple(s.value/1000 for s in ABC_SAMPLE_DATA),
+            "ABC Analysis Overview",
+            "Value (thousands $)"
         )
         
         st.plotly_chart(fig, width='stretch')
         
         # ABC Analysis details
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
-            <div class='card'>
-                <h3>A Items</h3>
-                <p><strong>Count:</strong> {abc_data['A']['items']}</p>
-                <p><strong>Value:</strong> ${abc_data['A']['value']:,}</p>
-                <p><strong>% of Total Value:</strong> {abc_data['A']['percentage']}</p>
-                <p><strong>Management:</strong> Tight control, accurate records, frequent review</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div class='card'>
-                <h3>B Items</h3>
-                <p><strong>Count:</strong> {abc_data['B']['items']}</p>
-                <p><strong>Value:</strong> ${abc_data['B']['value']:,}</p>
-                <p><strong>% of Total Value:</strong> {abc_data['B']['percentage']}</p>
-                <p><strong>Management:</strong> Regular review, normal controls</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class='card'>
-                <h3>C Items</h3>
-                <p><strong>Count:</strong> {abc_data['C']['items']}</p>
-                <p><strong>Value:</strong> ${abc_data['C']['value']:,}</p>
-                <p><strong>% of Total Value:</strong> {abc_data['C']['percentage']}</p>
-                <p><strong>Management:</strong> Simplest controls, bulk ordering, safety stock</p>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(
+            "<div class='card-grid'>"
+            + "".join(_abc_card_html(cat, stats) for cat, stats in zip("ABC", ABC_SAMPLE_DATA))
+            + "</div>",
+            unsafe_allow_html=True
+        )
 
         # Live ABC analysis using inventory data
-        st.markdown("### Live ABC Analysis")
-        try:
-            abc_result = inventory_manager.perform_abc_analysis()
-            products = product_manager.get_all_products()
-            inventory_items = inventory_manager.get_all_inventory()
-            product_lookup = {p["id"]: p for p in products}
-            inventory_lookup = {i["product_id"]: i for i in inventory_items}
-
-            def compute_category_stats(ids):
-                count = len(ids)
-                total_value = 0.0
-                for pid in ids:
-                    prod = product_lookup.get(pid)
-                    inv = inventory_lookup.get(pid)
-                    if prod and inv:
-                        total_value += float(prod["price"]) * float(inv["quantity"])
-                return count, total_value
-
-            a_count, a_value = compute_category_stats(abc_result.get("A", []))
-            b_count, b_value = compute_category_stats(abc_result.get("B", []))
-            c_count, c_value = compute_category_stats(abc_result.get("C", []))
-            total_value = max(a_value + b_value + c_value, 1e-9)
-            live_data = {
-                "A": {"items": a_count, "value": a_value, "percentage": f"{(a_value/total_value)*100:.1f}%"},
-                "B": {"items": b_count, "value": b_value, "percentage": f"{(b_value/total_value)*100:.1f}%"},
-                "C": {"items": c_count, "value": c_value, "percentage": f"{(c_value/total_value)*100:.1f}%"}
-            }
-
-            fig_live = go.Figure()
-            fig_live.add_trace(go.Bar(
-                x=["A", "B", "C"],
-                y=[live_data["A"]["items"], live_data["B"]["items"], live_data["C"]["items"]],
-                name="Number of Items",
-                marker_color=["#1E88E5", "#42A5F5", "#90CAF9"]
-            ))
-            fig_live.add_trace(go.Scatter(
-                x=["A", "B", "C"],
-                y=[live_data["A"]["value"], live_data["B"]["value"], live_data["C"]["value"]],
-                name="Category Value ($)",
-                yaxis="y2",
-                line=dict(color="#0D47A1", width=4)
-            ))
-            fig_live.update_layout(
-                title="Live ABC Analysis",
-                xaxis_title="Category",
-                yaxis_title="Number of Items",
-                yaxis2=dict(title="Category Value ($)", overlaying="y", side="right"),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig_live, width='stretch')
-
-            st.subheader("Items by ABC Category (Live)")
-            for cat in ["A", "B", "C"]:
-                ids = abc_result.get(cat, [])
-                rows = []
-                for pid in ids:
-                    prod = product_lookup.get(pid)
-                    inv = inventory_lookup.get(pid)
-                    if prod and inv:
-                        rows.append({
-                            "Product ID": pid,
-                            "Product": prod["name"],
-                            "Quantity": inv["quantity"],
-                            "Price": prod["price"],
-                            "Value": float(prod["price"]) * float(inv["quantity"])
-                        })
-                st.markdown(f"#### Category {cat}")
-                if rows:
-                    st.dataframe(pd.DataFrame(rows), width='stretch')
-                else:
-                    st.info("No items in this category.")
-        except Exception as e:
-            st.error(f"Failed to perform live ABC analysis: {e}")
+        _live_abc_fragment()
     
     with tab3:
         st.subheader("Just-in-Time (JIT) Inventory")
@@ -597,52 +983,12 @@ def inventory_management_page():
         # JIT implementation status
         st.subheader("JIT Implementation Status")
         
-        # Sample data
-        jit_status = {
-            "Supplier Integration": 85,
-            "Production Scheduling": 92,
-            "Quality Control": 78,
-            "Delivery Optimization": 65,
-            "Staff Training": 90
-        }
-        
-        fig = go.Figure()
-        
-        for category, value in jit_status.items():
-            fig.add_trace(go.Indicator(
-                mode="gauge+number",
-                value=value,
-                title={"text": category},
-                domain={"row": 0, "column": list(jit_status.keys()).index(category)},
-                gauge={
-                    "axis": {"range": [0, 100]},
-                    "bar": {"color": "#1E88E5"},
-                    "steps": [
-                        {"range": [0, 50], "color": "#FFCDD2"},
-                        {"range": [50, 80], "color": "#FFECB3"},
-                        {"range": [80, 100], "color": "#C8E6C9"}
-                    ]
-                }
-            ))
-        
-        fig.update_layout(
-            grid={"rows": 1, "columns": len(jit_status)},
-            height=250
-        )
-        
-        st.plotly_chart(fig, width='stretch')
+        fig = _jit_status_fig(JIT_STATUS)
+        st.plotly_chart(fig, width='stretch', config=STATIC_PLOT_CONFIG)
         
         # JIT product candidates
         st.subheader("Top JIT Product Candidates")
-        try:
-            jit_candidates = inventory_manager.get_jit_candidates()
-            if jit_candidates:
-                jit_df = pd.DataFrame(jit_candidates)
-                st.dataframe(jit_df, width='stretch')
-            else:
-                st.info("No JIT candidates identified.")
-        except Exception as e:
-            st.error(f"Failed to load JIT candidates: {e}")
+        _jit_candidates_fragment()
     
     with tab4:
         st.subheader("Economic Order Quantity (EOQ) Calculator")
@@ -675,7 +1021,7 @@ def inventory_management_page():
             calculate = st.form_submit_button("Calculate EOQ")
             
             if calculate:
-                eoq = round(np.sqrt((2 * annual_demand * order_cost) / holding_cost))
+                eoq = round(math.sqrt((2 * annual_demand * order_cost) / holding_cost))
                 optimal_orders = round(annual_demand / eoq)
                 total_order_cost = optimal_orders * order_cost
                 total_holding_cost = (eoq / 2) * holding_cost
@@ -697,67 +1043,7 @@ def inventory_management_page():
                 st.info(f"Total Annual Inventory Cost: ${total_cost:.2f}")
                 
                 # EOQ visualization
-                order_sizes = list(range(max(1, eoq - 100), eoq + 100, 10))
-                order_costs = []
-                holding_costs = []
-                total_costs = []
-                
-                for size in order_sizes:
-                    num_orders = annual_demand / size
-                    order_cost_val = num_orders * order_cost
-                    holding_cost_val = (size / 2) * holding_cost
-                    total_cost_val = order_cost_val + holding_cost_val
-                    
-                    order_costs.append(order_cost_val)
-                    holding_costs.append(holding_cost_val)
-                    total_costs.append(total_cost_val)
-                
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=order_sizes,
-                    y=order_costs,
-                    mode="lines",
-                    name="Order Cost",
-                    line=dict(color="#42A5F5", width=2)
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=order_sizes,
-                    y=holding_costs,
-                    mode="lines",
-                    name="Holding Cost",
-                    line=dict(color="#FF7043", width=2)
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=order_sizes,
-                    y=total_costs,
-                    mode="lines",
-                    name="Total Cost",
-                    line=dict(color="#66BB6A", width=3)
-                ))
-                
-                # Add vertical line at EOQ
-                fig.add_vline(x=eoq, line_dash="dash", line_color="#E91E63")
-                
-                fig.update_layout(
-                    title="Cost vs. Order Quantity",
-                    xaxis_title="Order Quantity",
-                    yaxis_title="Cost ($)",
-                    annotations=[
-                        dict(
-                            x=eoq,
-                            y=min(total_costs) * 1.1,
-                            text=f"EOQ = {eoq}",
-                            showarrow=True,
-                            arrowhead=1,
-                            ax=0,
-                            ay=-40
-                        )
-                    ]
-                )
-                
+                fig = _build_eoq_fig(eoq, annual_demand, order_cost, holding_cost)
                 st.plotly_chart(fig, )
     
     with tab5:
@@ -791,25 +1077,17 @@ def inventory_management_page():
             
             calculate = st.form_submit_button("Calculate Safety Stock")
             
-            if calculate:
-                # Service level Z-score mapping
-                z_scores = {
-                    80: 0.84,
-                    85: 1.04,
-                    90: 1.28,
-                    95: 1.65,
-                    96: 1.75,
-                    97: 1.88,
-                    98: 2.05,
-                    99: 2.33
-                }
-                
-                # Get closest z-score
-                z_score = z_scores.get(service_level, 1.65)
+            inputs = (avg_daily_demand, std_dev_demand, avg_lead_time, std_dev_lead_time, service_level)
+            last_result = st.session_state.get("safety_stock_result")
+            
+            # Recompute only on submit with changed inputs; otherwise keep showing
+            # the last result (and its figure) across unrelated reruns
+            if calculate and (last_result is None or last_result["inputs"] != inputs):
+                z_score = Z_SCORES[service_level]
                 
                 # Calculate safety stock
                 demand_during_lead_time = avg_daily_demand * avg_lead_time
-                std_dev_during_lead_time = np.sqrt(
+                std_dev_during_lead_time = math.sqrt(
                     (avg_lead_time * std_dev_demand**2) + 
                     (avg_daily_demand**2 * std_dev_lead_time**2)
                 )
@@ -817,85 +1095,18 @@ def inventory_management_page():
                 safety_stock = round(z_score * std_dev_during_lead_time)
                 reorder_point = round(demand_during_lead_time + safety_stock)
                 
-                st.success(f"Safety Stock: {safety_stock} units")
-                st.info(f"Reorder Point: {reorder_point} units")
-                
-                # Safety stock visualization
-                fig = go.Figure()
-                
-                # Generate time series data
-                days = 30
-                x = list(range(1, days + 1))
-                
-                # Normal demand
-                normal_demand = [avg_daily_demand for _ in range(days)]
-                
-                # Actual demand with some randomness
-                np.random.seed(42)  # For reproducibility
-                actual_demand = [max(0, avg_daily_demand + np.random.normal(0, std_dev_demand)) for _ in range(days)]
-                
-                # Inventory level simulation
-                inventory = [reorder_point + 500]  # Start with reorder point + some buffer
-                
-                for i in range(1, days):
-                    # Decrease by previous day's demand
-                    new_level = inventory[i-1] - actual_demand[i-1]
-                    
-                    # If below reorder point, restock
-                    if new_level <= reorder_point:
-                        new_level = reorder_point + 500  # Restock to reorder point + buffer
-                    
-                    inventory.append(new_level)
-                
-                # Plot inventory level
-                fig.add_trace(go.Scatter(
-                    x=x,
-                    y=inventory,
-                    mode="lines",
-                    name="Inventory Level",
-                    line=dict(color="#1E88E5", width=3)
-                ))
-                
-                # Add actual demand
-                fig.add_trace(go.Bar(
-                    x=x,
-                    y=actual_demand,
-                    name="Daily Demand",
-                    marker_color="#90CAF9"
-                ))
-                
-                # Add reorder point line
-                fig.add_hline(
-                    y=reorder_point,
-                    line_dash="dash",
-                    line_color="#E91E63",
-                    annotation_text="Reorder Point",
-                    annotation_position="bottom right"
-                )
-                
-                # Add safety stock line
-                fig.add_hline(
-                    y=safety_stock,
-                    line_dash="dash",
-                    line_color="#FF7043",
-                    annotation_text="Safety Stock",
-                    annotation_position="bottom left"
-                )
-                
-                fig.update_layout(
-                    title="Inventory Level Simulation with Safety Stock",
-                    xaxis_title="Day",
-                    yaxis_title="Units",
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
-                )
-                
-                st.plotly_chart(fig, width='stretch')
+                last_result = st.session_state.safety_stock_result = {
+                    "inputs": inputs,
+                    "safety_stock": safety_stock,
+                    "reorder_point": reorder_point,
+                    # Safety stock visualization
+                    "fig": _build_safety_stock_fig(avg_daily_demand, std_dev_demand, reorder_point, safety_stock)
+                }
+            
+            if last_result is not None:
+                st.success(f"Safety Stock: {last_result['safety_stock']} units")
+                st.info(f"Reorder Point: {last_result['reorder_point']} units")
+                st.plotly_chart(last_result["fig"], width='stretch')
 
 def products_page():
     st.markdown("<h1 class='main-header'>Products</h1>", unsafe_allow_html=True)
@@ -912,31 +1123,23 @@ def products_page():
     with col3:
         status_filter = st.selectbox("Status", ["All", "In Stock", "Low Stock", "Out of Stock"])
     
-    # Sample product data
-    products = [
-        {"id": "P001", "name": "Smartphone X", "category": "Electronics", "price": 699.99, "stock": 45, "status": "In Stock"},
-        {"id": "P002", "name": "Laptop Pro", "category": "Electronics", "price": 1299.99, "stock": 20, "status": "In Stock"},
-        {"id": "P003", "name": "Wireless Earbuds", "category": "Electronics", "price": 129.99, "stock": 8, "status": "Low Stock"},
-        {"id": "P004", "name": "Cotton T-Shirt", "category": "Clothing", "price": 19.99, "stock": 150, "status": "In Stock"},
-        {"id": "P005", "name": "Denim Jeans", "category": "Clothing", "price": 49.99, "stock": 75, "status": "In Stock"},
-        {"id": "P006", "name": "Coffee Maker", "category": "Home Goods", "price": 89.99, "stock": 0, "status": "Out of Stock"},
-        {"id": "P007", "name": "Blender", "category": "Home Goods", "price": 69.99, "stock": 12, "status": "In Stock"},
-        {"id": "P008", "name": "Organic Coffee", "category": "Food & Beverage", "price": 12.99, "stock": 30, "status": "In Stock"},
-        {"id": "P009", "name": "Notebook Set", "category": "Office Supplies", "price": 15.99, "stock": 5, "status": "Low Stock"},
-        {"id": "P010", "name": "Desk Lamp", "category": "Home Goods", "price": 34.99, "stock": 18, "status": "In Stock"}
-    ]
-    
     # Apply filters
-    filtered_products = products
+    mask = np.ones(len(PRODUCTS_DF), dtype=bool)
     
     if search_query:
-        filtered_products = [p for p in filtered_products if search_query.lower() in p["name"].lower() or search_query.lower() in p["id"].lower()]
+        query = search_query.lower()
+        mask &= (
+            PRODUCT_NAMES_LOWER.str.contains(query, regex=False)
+            | PRODUCT_IDS_LOWER.str.contains(query, regex=False)
+        ).to_numpy()
     
     if category_filter != "All Categories":
-        filtered_products = [p for p in filtered_products if p["category"] == category_filter]
+        mask &= PRODUCTS_DF["category"].eq(category_filter).to_numpy()
     
     if status_filter != "All":
-        filtered_products = [p for p in filtered_products if p["status"] == status_filter]
+        mask &= PRODUCTS_DF["status"].eq(status_filter).to_numpy()
+    
+    filtered_products = list(PRODUCTS_DF[mask].itertuples(index=False))
     
     # Display products in a grid
     if filtered_products:
@@ -946,27 +1149,24 @@ def products_page():
         for i in range(0, len(filtered_products), 3):
             cols = st.columns(3)
             
-            for j in range(3):
-                if i + j < len(filtered_products):
-                    product = filtered_products[i + j]
+            for j, product in enumerate(filtered_products[i:i + 3]):
+                with cols[j]:
+                    st.markdown(f"""
+                    <div class='card'>
+                        <h3>{product.name}</h3>
+                        <p><strong>ID:</strong> {product.id}</p>
+                        <p><strong>Category:</strong> {product.category}</p>
+                        <p><strong>Price:</strong> ${product.price}</p>
+                        <p><strong>Stock:</strong> {product.stock} units</p>
+                        <p><strong>Status:</strong> {product.status}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
                     
-                    with cols[j]:
-                        st.markdown(f"""
-                        <div class='card'>
-                            <h3>{product['name']}</h3>
-                            <p><strong>ID:</strong> {product['id']}</p>
-                            <p><strong>Category:</strong> {product['category']}</p>
-                            <p><strong>Price:</strong> ${product['price']}</p>
-                            <p><strong>Stock:</strong> {product['stock']} units</p>
-                            <p><strong>Status:</strong> {product['status']}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.button("Edit", key=f"edit_{product['id']}")
-                        with col2:
-                            st.button("Restock", key=f"restock_{product['id']}")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.button("Edit", key=f"edit_{product.id}")
+                    with col2:
+                        st.button("Restock", key=f"restock_{product.id}")
     else:
         st.warning("No products found matching your criteria")
     
@@ -1007,19 +1207,8 @@ def analytics_page():
     # Revenue trends
     st.subheader("Revenue Trends")
     
-    # Sample data
-    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"]
-    revenue = [980000, 1050000, 920000, 1100000, 1150000, 1250000, 1200000]
-    
-    fig = px.line(
-        x=months,
-        y=revenue,
-        labels={"x": "Month", "y": "Revenue ($)"},
-        markers=True
-    )
-    
-    fig.update_traces(line_color="#1E88E5", line_width=3)
-    st.plotly_chart(fig, width='stretch')
+    fig = _build_revenue_fig(REVENUE_MONTHS, MONTHLY_REVENUE)
+    st.plotly_chart(fig, width='stretch', config=STATIC_PLOT_CONFIG)
     
     # Order and inventory analysis
     col1, col2 = st.columns(2)
@@ -1027,131 +1216,26 @@ def analytics_page():
     with col1:
         st.subheader("Order Status Distribution")
         
-        # Sample data
-        order_statuses = ["Delivered", "In Transit", "Processing", "Delayed", "Cancelled"]
-        order_counts = [450, 120, 80, 30, 20]
-        
-        fig = px.pie(
-            names=order_statuses,
-            values=order_counts,
-            hole=0.4,
-            color_discrete_sequence=px.colors.sequential.Blues
-        )
-        
-        fig.update_traces(textposition="inside", textinfo="percent+label")
-        st.plotly_chart(fig, width='stretch')
+        fig = _build_order_status_fig(ORDER_STATUSES, ORDER_STATUS_COUNTS)
+        st.plotly_chart(fig, width='stretch', config=STATIC_PLOT_CONFIG)
     
     with col2:
         st.subheader("Inventory Status")
         
-        # Sample data
-        inventory_statuses = ["Optimal", "Low Stock", "Overstock", "Out of Stock"]
-        inventory_counts = [650, 150, 100, 50]
-        
-        fig = px.bar(
-            x=inventory_statuses,
-            y=inventory_counts,
-            color=inventory_counts,
-            color_continuous_scale="Blues",
-            labels={"x": "Status", "y": "Number of SKUs"}
-        )
-        
+        fig = _build_inventory_status_fig(INVENTORY_STATUSES, INVENTORY_STATUS_COUNTS)
         st.plotly_chart(fig, width='stretch')
     
     # Category performance
     st.subheader("Category Performance")
     
-    # Sample data
-    categories = ["Electronics", "Clothing", "Home Goods", "Food & Beverage", "Office Supplies"]
-    sales = [450000, 320000, 280000, 100000, 50000]
-    growth = [12.5, 8.2, 15.3, 5.7, -2.1]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        x=categories,
-        y=sales,
-        name="Sales ($)",
-        marker_color="#42A5F5"
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=categories,
-        y=growth,
-        name="Growth (%)",
-        mode="markers+lines",
-        marker=dict(size=12, color="#E91E63"),
-        line=dict(color="#E91E63", width=2),
-        yaxis="y2"
-    ))
-    
-    fig.update_layout(
-        xaxis_title="Category",
-        yaxis_title="Sales ($)",
-        yaxis2=dict(
-            title="Growth (%)",
-            overlaying="y",
-            side="right",
-            range=[-5, 20]
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    
+    fig = _build_category_fig(CATEGORIES, CATEGORY_SALES, CATEGORY_GROWTH)
     st.plotly_chart(fig, width='stretch')
     
     # Supply chain performance
     st.subheader("Supply Chain Performance Metrics")
     
-    # Sample data
-    metrics = {
-        "Perfect Order Rate": 92.5,
-        "Order Cycle Time": 85.3,
-        "Inventory Accuracy": 96.8,
-        "Supplier On-Time Delivery": 89.2,
-        "Backorder Rate": 78.6,
-        "Fill Rate": 94.3
-    }
-    
-    fig = go.Figure()
-
-    # Arrange indicators in 2 rows x 3 columns to avoid overlap
-    metric_names = list(metrics.keys())
-    cols = 3
-    rows = 2
-    for name in metric_names:
-        idx = metric_names.index(name)
-        r = idx // cols
-        c = idx % cols
-        value = metrics[name]
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=value,
-            title={"text": name},
-            domain={"row": r, "column": c},
-            gauge={
-                "axis": {"range": [0, 100]},
-                "bar": {"color": "#1E88E5"},
-                "steps": [
-                    {"range": [0, 60], "color": "#FFCDD2"},
-                    {"range": [60, 80], "color": "#FFECB3"},
-                    {"range": [80, 100], "color": "#C8E6C9"}
-                ]
-            }
-        ))
-
-    fig.update_layout(
-        grid={"rows": rows, "columns": cols, "pattern": "independent"},
-        height=600,
-        margin=dict(t=40, b=40, l=20, r=20)
-    )
-    
-    st.plotly_chart(fig, width='stretch')
+    fig = _build_performance_fig(PERFORMANCE_METRICS)
+    st.plotly_chart(fig, width='stretch', config=STATIC_PLOT_CONFIG)
 
 def supply_chain_assistant_page():
     st.markdown("<h1 class='main-header'>Supply Chain Assistant</h1>", unsafe_allow_html=True)
@@ -1191,16 +1275,8 @@ def supply_chain_assistant_page():
             st.session_state.chat_history.append({"role": "user", "content": user_input})
             
             # Sample response (in a real app, this would be processed by a RAG system)
-            if "inventory" in user_input.lower():
-                response = "Based on our current inventory data, we have 987 SKUs in stock, 152 items are running low, and 106 items are out of stock. The overall inventory accuracy is at 87%, which is slightly below our target of 90%. Would you like me to provide more specific information about a particular product category?"
-            elif "order" in user_input.lower():
-                response = "We currently have 152 active orders in the system. 120 are on schedule for delivery, 25 are in processing, and 7 are experiencing delays due to supplier issues. The on-time delivery rate is 98.2% for this month, which is above our target of 95%. Is there a specific order you'd like to know more about?"
-            elif "supplier" in user_input.lower():
-                response = "We work with 45 active suppliers. Our top-performing supplier is ABC Electronics with a 99.5% on-time delivery rate. We're currently experiencing delays with XYZ Manufacturing, affecting some of our electronic components. Would you like me to provide a full supplier performance report?"
-            elif "analytics" in user_input.lower():
-                response = "Our latest analytics show a revenue increase of 8.5% compared to last month. The best-performing product category is Electronics with a 12.5% growth rate. Our inventory turnover has improved to 5.3 times per year. Would you like me to generate a detailed analytics report for a specific time period?"
-            else:
-                response = "I'm your supply chain assistant, ready to help with inventory management, order tracking, supplier information, and analytics. You can ask me about current inventory levels, order status, supplier performance, or request analytics reports. How can I assist you today?"
+            match = CHAT_INTENT_RE.search(user_input)
+            response = CHAT_INTENT_RESPONSES[match.group(1).lower()] if match else CHAT_DEFAULT_RESPONSE
             
             # Add assistant response to chat history
             st.session_state.chat_history.append({"role": "assistant", "content": response})
@@ -1247,22 +1323,19 @@ def document_upload_page():
         
         if st.button("Process Document"):
             with st.spinner("Processing document..."):
-                # Import necessary modules
-                import tempfile
-                from rag.document_processor import DocumentProcessor
-                
                 # Create temp directory if it doesn't exist
                 temp_dir = os.path.join(os.getcwd(), "temp_uploads")
                 os.makedirs(temp_dir, exist_ok=True)
                 
                 # Save the uploaded file to a temporary location
                 temp_file_path = os.path.join(temp_dir, uploaded_file.name)
+                uploaded_file.seek(0)
                 with open(temp_file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                    shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
                 
                 # Process the document
-                document_processor = DocumentProcessor()
-                rag_handler = RAGHandler(mock=False)  # Set to False to use actual Pinecone
+                document_processor = get_document_processor()
+                rag_handler = get_rag_handler()
                 
                 # Process document and get chunks with embeddings
                 document_chunks = document_processor.process_document(
@@ -1270,21 +1343,14 @@ def document_upload_page():
                     metadata={"filename": uploaded_file.name, "upload_date": str(pd.Timestamp.now())}
                 )
                 
-                # Add document chunks to Pinecone
-                for chunk in document_chunks:
-                    rag_handler.add_document(
-                        text=chunk["text"],
-                        metadata=chunk["metadata"]
-                    )
+                # Add document chunks to Pinecone in batched upserts
+                rag_handler.add_documents(document_chunks)
                 
                 st.success("Document processed and indexed successfully!")
                 
-                # Force refresh of the document library by clearing cache
-                if 'document_library_cache' in st.session_state:
-                    del st.session_state.document_library_cache
-                
-                # Rerun the app to refresh the document library
-                st.rerun()
+                # The library below is rendered later in this same run, so
+                # clearing its cache is enough to show the new document
+                _cached_documents.clear()
                 
                 if generate_summary:
                     st.subheader("Document Summary")
@@ -1301,19 +1367,19 @@ def document_upload_page():
                         "Supplier Responsiveness": "4.2/5"
                     }
                     
-                    for metric, value in metrics.items():
-                        st.metric(metric, value)
+                    st.dataframe(
+                        pd.DataFrame.from_dict(metrics, orient="index", columns=["Value"]),
+                        width='stretch'
+                    )
     
     # Document library
     st.subheader("Document Library")
     
     # Get uploaded documents from RAG handler
     try:
-        rag_handler = RAGHandler(mock=False, api_key=os.environ.get("PINECONE_API_KEY"))
-        uploaded_documents = rag_handler.get_all_documents()
+        doc_df = _cached_documents()
         
-        if uploaded_documents:
-            doc_df = pd.DataFrame(uploaded_documents)
+        if not doc_df.empty:
             st.dataframe(doc_df, width='stretch')
         else:
             st.info("No documents uploaded yet. Upload documents above to see them in the library.")
@@ -1321,14 +1387,7 @@ def document_upload_page():
     except Exception as e:
         st.error(f"Error loading document library: {str(e)}")
         # Fallback to sample documents
-        documents = [
-            {"name": "Supplier Performance Q2 2023.pdf", "type": "PDF", "uploaded": "2023-07-10", "size": "2.4 MB"},
-            {"name": "Inventory Analysis June 2023.xlsx", "type": "Excel", "uploaded": "2023-07-05", "size": "1.8 MB"},
-            {"name": "Logistics Cost Report.docx", "type": "Word", "uploaded": "2023-06-28", "size": "950 KB"},
-            {"name": "Warehouse Optimization Plan.pdf", "type": "PDF", "uploaded": "2023-06-15", "size": "3.2 MB"},
-            {"name": "Supplier Contracts 2023.pdf", "type": "PDF", "uploaded": "2023-06-01", "size": "5.1 MB"}
-        ]
-        doc_df = pd.DataFrame(documents)
+        doc_df = SAMPLE_DOCUMENTS_DF
         st.dataframe(doc_df, width='stretch')
     
     # Query documents section
@@ -1340,7 +1399,7 @@ def document_upload_page():
         with st.spinner("Searching documents..."):
             try:
                 # Use QueryEngine to process the query via RAG
-                result = query_engine.process_query(query, top_k=5)
+                result = get_query_engine().process_query(query, top_k=5)
                 st.write("### Search Results")
                 
                 # Display answer
@@ -1355,61 +1414,50 @@ def document_upload_page():
                 sources = result.get('sources', [])
                 if sources:
                     st.write("### Sources")
-                    for src in sources:
-                        md = src.get('metadata', {})
-                        name = md.get('file_name') or md.get('filename') or 'Unknown Document'
-                        score = src.get('score', 0)
-                        preview = (md.get('text') or '')[:200]
-                        st.markdown(f"""
-                        <div class='card'>
-                            <p><strong>Document:</strong> {name}</p>
-                            <p><strong>Score:</strong> {round(score, 4)}</p>
-                            <p><strong>Excerpt:</strong> {preview}...</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown("".join(
+                        "<div class='card'>"
+                        f"<p><strong>Document:</strong> {_source_name(src)}</p>"
+                        f"<p><strong>Score:</strong> {round(src.get('score', 0), 4)}</p>"
+                        f"<p><strong>Excerpt:</strong> {(src.get('metadata', {}).get('text') or '')[:200]}...</p>"
+                        "</div>"
+                        for src in sources
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No relevant sources found. Try rephrasing your question or uploading more documents.")
                 
                 # Related documents (top 2)
                 if sources:
                     st.write("### Related Documents")
-                    cols = st.columns(2)
-                    for i, src in enumerate(sources[:2]):
-                        md = src.get('metadata', {})
-                        name = md.get('file_name') or md.get('filename') or 'Unknown Document'
-                        score = src.get('score', 0)
-                        preview = (md.get('text') or '')[:240]
-                        with cols[i]:
-                            st.markdown(f"""
-                            <div class='card'>
-                                <h4>{name}</h4>
-                                <p><strong>Relevance:</strong> {round(score * 100, 1)}%</p>
-                                <p><strong>Excerpt:</strong> {preview}...</p>
-                            </div>
-                            """, unsafe_allow_html=True)
+                    st.markdown("<div class='card-grid two-columns'>" + "".join(
+                        "<div class='card'>"
+                        f"<h4>{_source_name(src)}</h4>"
+                        f"<p><strong>Relevance:</strong> {round(src.get('score', 0) * 100, 1)}%</p>"
+                        f"<p><strong>Excerpt:</strong> {(src.get('metadata', {}).get('text') or '')[:240]}...</p>"
+                        "</div>"
+                        for src in sources[:2]
+                    ) + "</div>", unsafe_allow_html=True)
             except Exception as e:
                 st.error(f"Search failed: {str(e)}")
 
 # Main app logic
 def main():
+    # Navigation options
+    pages = [
+        st.Page(home_page, title="Home", icon="🏠", default=True),
+        st.Page(order_management_page, title="Order Management", icon="📦"),
+        st.Page(inventory_management_page, title="Inventory Management", icon="🧮"),
+        st.Page(products_page, title="Products", icon="🛒"),
+        st.Page(analytics_page, title="Analytics", icon="📊"),
+        st.Page(supply_chain_assistant_page, title="Supply Chain Assistant", icon="🤖"),
+        st.Page(document_upload_page, title="Document Upload", icon="📄")
+    ]
+    pg = st.navigation(pages, position="hidden")
+    
     # Display sidebar
-    sidebar()
+    sidebar(pages)
     
     # Render the selected page
-    if st.session_state.current_page == "Home":
-        home_page()
-    elif st.session_state.current_page == "Order Management":
-        order_management_page()
-    elif st.session_state.current_page == "Inventory Management":
-        inventory_management_page()
-    elif st.session_state.current_page == "Products":
-        products_page()
-    elif st.session_state.current_page == "Analytics":
-        analytics_page()
-    elif st.session_state.current_page == "Supply Chain Assistant":
-        supply_chain_assistant_page()
-    elif st.session_state.current_page == "Document Upload":
-        document_upload_page()
+    pg.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
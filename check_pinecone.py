@@ -3,14 +3,68 @@
 Utility script to check document embeddings in Pinecone DB
 """
 
+import functools
 import os
+import numpy as np
 from dotenv import load_dotenv
-from pinecone import Pinecone
+from pinecone.grpc import PineconeGRPC as Pinecone
 import json
 
 # Load environment variables
 load_dotenv()
 
+# Semantic cache of prior searches: [index_name, unit query vector, matches],
+# least recently used first
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_SIZE = 512
+_semantic_cache = []
+
+@functools.lru_cache(maxsize=None)
+def _get_client(api_key):
+    """Shared Pinecone client for the given API key"""
+    return Pinecone(api_key=api_key)
+
+@functools.lru_cache(maxsize=None)
+def _get_index_names(api_key):
+    """Index names, listed once per run (cleared when an index is created)"""
+    return list(_get_client(api_key).list_indexes().names())
+
+@functools.lru_cache(maxsize=None)
+def _get_index(api_key, index_name):
+    """Index handle targeted by host, so data calls skip the describe_index lookup"""
+    pc = _get_client(api_key)
+    return pc.Index(host=pc.describe_index(index_name).host)
+
+@functools.lru_cache(maxsize=None)
+def _get_model():
+    """Embedding model, loaded on first use and shared with the RAG components"""
+    from rag.embedding_model import get_model
+    return get_model('all-MiniLM-L6-v2')
+
+@functools.lru_cache(maxsize=256)
+def _embed_query(query_text):
+    """Query embedding, memoized on the whitespace-normalized text"""
+    return tuple(_get_model().encode(query_text).tolist())
+
+def _semantic_lookup(index_name, query_vector):
+    """Matches of a cached search whose query is similar enough, else None"""
+    candidates = [i for i, entry in enumerate(_semantic_cache) if entry[0] == index_name]
+    if not candidates:
+        return None
+    sims = np.stack([_semantic_cache[i][1] for i in candidates]) @ query_vector
+    best = int(np.argmax(sims))
+    if sims[best] < SEMANTIC_CACHE_THRESHOLD:
+        return None
+    entry = _semantic_cache.pop(candidates[best])
+    _semantic_cache.append(entry)
+    return entry[2]
+
+def _semantic_store(index_name, query_vector, matches):
+    """Remember a search, evicting the least recently used entry when full"""
+    _semantic_cache.append([index_name, query_vector, matches])
+    if len(_semantic_cache) > SEMANTIC_CACHE_SIZE:
+        _semantic_cache.pop(0)
+
 def check_pinecone_index():
     """Check the contents of the Pinecone index"""
     
@@ -21,16 +75,12 @@ def check_pinecone_index():
         return
     
     try:
-        # Initialize Pinecone client
-        pc = Pinecone(api_key=api_key)
-        
         # List all indexes
-        indexes = pc.list_indexes()
-        print(f"📋 Available indexes: {indexes.names()}")
+        available_indexes = _get_index_names(api_key)
+        print(f"📋 Available indexes: {available_indexes}")
         
         # Check our specific index
         index_name = "scm-documents"
-        available_indexes = indexes.names()
         
         if index_name not in available_indexes:
             print(f"❌ Index '{index_name}' not found")
@@ -44,7 +94,7 @@ def check_pinecone_index():
                 return
         
         # Get index stats
-        index = pc.Index(index_name)
+        index = _get_index(api_key, index_name)
         stats = index.describe_index_stats()
         
         print(f"\n📊 Index Statistics for '{index_name}':")
@@ -97,35 +147,35 @@ def search_documents(query_text="supply chain"):
         return
     
     try:
-        from sentence_transformers import SentenceTransformer
-        
-        # Initialize model and Pinecone
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        pc = Pinecone(api_key=api_key)
-        
         # Use existing index or the one we want
-        indexes = pc.list_indexes().names()
+        indexes = _get_index_names(api_key)
         index_name = "scm-documents" if "scm-documents" in indexes else (indexes[0] if indexes else None)
         
         if not index_name:
             print("❌ No indexes available for search")
             return
             
-        index = pc.Index(index_name)
+        index = _get_index(api_key, index_name)
         
         # Create query vector
-        query_vector = model.encode(query_text).tolist()
+        query_vector = list(_embed_query(" ".join(query_text.split())))
+        unit_vector = np.asarray(query_vector, dtype=np.float32)
+        unit_vector /= np.linalg.norm(unit_vector) or 1.0
         
-        # Search
-        results = index.query(
-            vector=query_vector,
-            top_k=5,
-            include_metadata=True
-        )
+        # Search, unless a near-identical query was answered already
+        matches = _semantic_lookup(index_name, unit_vector)
+        if matches is None:
+            results = index.query(
+                vector=query_vector,
+                top_k=5,
+                include_metadata=True
+            )
+            matches = results.matches
+            _semantic_store(index_name, unit_vector, matches)
         
         print(f"\n🔍 Search Results for '{query_text}' in index '{index_name}':")
-        if results.matches:
-            for i, match in enumerate(results.matches, 1):
+        if matches:
+            for i, match in enumerate(matches, 1):
                 print(f"\n   Result {i}:")
                 print(f"   - ID: {match.id}")
                 print(f"   - Similarity Score: {match.score:.4f}")
@@ -145,6 +195,48 @@ def search_documents(query_text="supply chain"):
     except Exception as e:
         print(f"❌ Error searching documents: {str(e)}")
 
+def batch_search(queries, top_k=5):
+    """Search several queries at once: one encoder call, concurrent index queries"""
+    
+    api_key = os.environ.get("PINECONE_API_KEY")
+    if not api_key:
+        print("❌ PINECONE_API_KEY not found")
+        return
+    
+    try:
+        indexes = _get_index_names(api_key)
+        index_name = "scm-documents" if "scm-documents" in indexes else (indexes[0] if indexes else None)
+        
+        if not index_name:
+            print("❌ No indexes available for search")
+            return
+            
+        index = _get_index(api_key, index_name)
+        
+        # Embed every query in one batched encoder call
+        texts = [" ".join(query_text.split()) for query_text in queries]
+        vectors = _get_model().encode(texts, batch_size=32, convert_to_numpy=True).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit_vectors = vectors / np.where(norms == 0, 1.0, norms)
+        
+        # Serve near-duplicates from the semantic cache, send the rest concurrently
+        all_matches = [_semantic_lookup(index_name, unit_vector) for unit_vector in unit_vectors]
+        futures = {
+            i: index.query(vector=vectors[i].tolist(), top_k=top_k, include_metadata=True, async_req=True)
+            for i, matches in enumerate(all_matches) if matches is None
+        }
+        for i, future in futures.items():
+            all_matches[i] = future.result().matches
+            _semantic_store(index_name, unit_vectors[i], all_matches[i])
+        
+        print(f"\n🔍 Batch search of {len(texts)} queries in index '{index_name}' ({len(futures)} sent to Pinecone):")
+        for query_text, matches in zip(queries, all_matches):
+            print(f"   - '{query_text}': {len(matches)} matches")
+        return all_matches
+                    
+    except Exception as e:
+        print(f"❌ Error searching documents: {str(e)}")
+
 def create_scm_index():
     """Create the SCM documents index if it doesn't exist"""
     
@@ -156,10 +248,10 @@ def create_scm_index():
     try:
         from pinecone import ServerlessSpec
         
-        pc = Pinecone(api_key=api_key)
+        pc = _get_client(api_key)
         index_name = "scm-documents"
         
-        if index_name not in pc.list_indexes().names():
+        if index_name not in _get_index_names(api_key):
             print(f"🔨 Creating index '{index_name}'...")
             pc.create_index(
                 name=index_name,
@@ -171,11 +263,16 @@ def create_scm_index():
                 )
             )
             print(f"✅ Index '{index_name}' created successfully!")
+            _get_index_names.cache_clear()
             
-            # Wait a moment for the index to be ready
+            # Poll until the index is ready, backing off up to 2s between checks
             import time
             print("⏳ Waiting for index to be ready...")
-            time.sleep(10)
+            deadline = time.monotonic() + 30
+            delay = 0.25
+            while not pc.describe_index(index_name).status['ready'] and time.monotonic() < deadline:
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
         else:
             print(f"✅ Index '{index_name}' already exists")
             
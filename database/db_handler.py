@@ -1,21 +1,92 @@
+import operator
 import os
+import pandas as pd
 import pymongo
+from datetime import datetime
 from dotenv import load_dotenv
 
+# Stand-in for a missing field, so it never equals a queried value
+_MISSING = object()
+
+# Leave Mongo's internal _id out of results, matching the mock documents
+_DEFAULT_PROJECTION = {"_id": 0}
+
+# Comparison operators the mock backend understands, in fields and in $expr
+_COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$in": lambda value, options: value in options
+}
+
+def _is_operator_document(value):
+    """Whether a query value is an operator document such as {"$lte": 10}."""
+    return isinstance(value, dict) and bool(value) and all(key in _COMPARISONS for key in value)
+
+def _compile_expr(expr):
+    """
+    Turn a {"$op": [a, b]} $expr into a predicate; "$field" strings refer to document fields.
+    
+    Documents missing a referenced field never match.
+    """
+    (op, (left, right)), = expr.items()
+    compare = _COMPARISONS[op]
+    
+    def operand(value):
+        if isinstance(value, str) and value.startswith("$"):
+            field = value[1:]
+            return lambda item: item.get(field, _MISSING)
+        return lambda item: value
+    
+    left, right = operand(left), operand(right)
+    
+    def predicate(item):
+        a, b = left(item), right(item)
+        return a is not _MISSING and b is not _MISSING and compare(a, b)
+    return predicate
+
 class DatabaseHandler:
     """
     Handles database connections and operations for the supply chain management system.
     Uses MongoDB for document storage.
     """
     
-    def __init__(self):
-        """Initialize database connection."""
+    # Primary key of each mock collection; lookups on these fields use a hash index
+    PRIMARY_KEYS = {
+        "products": "id",
+        "inventory": "product_id",
+        "orders": "id",
+        "suppliers": "id",
+        "customers": "id"
+    }
+    
+    # Frequently queried non-unique fields; equality lookups on these use a hash index
+    SECONDARY_KEYS = {
+        "products": ("category", "supplier_id"),
+        "orders": ("status",)
+    }
+    
+    # MongoClient shared by every handler in the process; it owns the connection pool
+    _shared_client = None
+    
+    def __init__(self, pool_size=None):
+        """
+        Initialize database connection.
+        
+        Args:
+            pool_size (int, optional): Maximum number of pooled connections the client may open.
+                Defaults to 2 * CPU cores + 1, capped at 50.
+        """
         load_dotenv()
         
         # For demonstration purposes, we'll use a mock connection
         # In production, you would use actual MongoDB connection
         self.client = None
         self.db = None
+        self.pool_size = pool_size or min(50, (os.cpu_count() or 1) * 2 + 1)
         
         # Initialize mock data
         self.initialize_mock_data()
@@ -26,11 +97,22 @@ class DatabaseHandler:
         In a real application, this would use environment variables for connection details.
         """
         try:
-            # MongoDB connection string would be stored in environment variables
-            # connection_string = os.getenv("MONGODB_URI")
-            # self.client = pymongo.MongoClient(connection_string)
-            # self.db = self.client.get_database("supply_chain_db")
-            pass
+            # MongoDB connection string is stored in environment variables
+            connection_string = os.getenv("MONGODB_URI")
+            if not connection_string:
+                return
+            
+            # Create the pooled client once; later handlers reuse its connections
+            if DatabaseHandler._shared_client is None:
+                DatabaseHandler._shared_client = pymongo.MongoClient(
+                    connection_string,
+                    maxPoolSize=self.pool_size,
+                    minPoolSize=2,
+                    serverSelectionTimeoutMS=5000,
+                    socketTimeoutMS=10000
+                )
+            self.client = DatabaseHandler._shared_client
+            self.db = self.client.get_database("supply_chain_db")
         except Exception as e:
             print(f"Error connecting to database: {e}")
     
@@ -78,7 +160,7 @@ class DatabaseHandler:
             {
                 "id": "ORD-12345",
                 "customer_id": "C001",
-                "order_date": "2023-07-10",
+                "order_date": datetime(2023, 7, 10),
                 "status": "In Transit",
                 "estimated_delivery": "2023-07-17",
                 "items": [
@@ -91,7 +173,7 @@ class DatabaseHandler:
             {
                 "id": "ORD-12346",
                 "customer_id": "C002",
-                "order_date": "2023-07-12",
+                "order_date": datetime(2023, 7, 12),
                 "status": "Processing",
                 "estimated_delivery": "2023-07-19",
                 "items": [
@@ -104,7 +186,7 @@ class DatabaseHandler:
             {
                 "id": "ORD-12347",
                 "customer_id": "C003",
-                "order_date": "2023-07-08",
+                "order_date": datetime(2023, 7, 8),
                 "status": "Delivered",
                 "estimated_delivery": "2023-07-15",
                 "delivery_date": "2023-07-14",
@@ -190,88 +272,554 @@ class DatabaseHandler:
                 "order_history": ["ORD-12347"]
             }
         ]
+        
+        self._build_indices()
+        
+        # Write counters per collection, so readers can cache derived data
+        self._versions = {collection_name: 0 for collection_name in self.collections}
+        # collection name -> (version, DataFrame of the collection)
+        self._frames = {}
+    
+    def _build_indices(self):
+        """Index every mock collection by its primary key and by document identity."""
+        self._primary = {}
+        # Primary key values held by more than one document
+        self._duplicate_keys = {}
+        # Documents keyed by id(), in insertion order, so deletes are O(1);
+        # the lists in self.collections are views rebuilt after deletes
+        self._documents = {}
+        self._stale_views = set()
+        # collection -> field -> value -> documents keyed by id(), for SECONDARY_KEYS
+        self._secondary = {}
+        for collection_name, collection in self.collections.items():
+            key = self.PRIMARY_KEYS.get(collection_name)
+            index = {}
+            duplicates = set()
+            if key is not None:
+                for item in collection:
+                    if key in item:
+                        if item[key] in index:
+                            duplicates.add(item[key])
+                        else:
+                            index[item[key]] = item
+            self._primary[collection_name] = index
+            self._duplicate_keys[collection_name] = duplicates
+            self._documents[collection_name] = {id(item): item for item in collection}
+            self._secondary[collection_name] = {
+                field: {} for field in self.SECONDARY_KEYS.get(collection_name, ())
+            }
+            for item in collection:
+                self._index_secondary(collection_name, item)
+    
+    def _index_secondary(self, collection_name, item, fields=None):
+        """Add a document to the secondary indices of its collection."""
+        for field, index in self._secondary[collection_name].items():
+            if (fields is None or field in fields) and field in item:
+                try:
+                    index.setdefault(item[field], {})[id(item)] = item
+                except TypeError:
+                    # Unhashable value; equality queries on it fall back to a scan
+                    pass
+    
+    def _unindex_secondary(self, collection_name, item, values=None):
+        """Remove a document from the secondary indices, using its old field values if given."""
+        values = item if values is None else values
+        for field, index in self._secondary[collection_name].items():
+            if field in values:
+                try:
+                    bucket = index.get(values[field])
+                except TypeError:
+                    continue
+                if bucket is not None:
+                    bucket.pop(id(item), None)
+                    if not bucket:
+                        del index[values[field]]
+    
+    def _candidates(self, collection_name, query):
+        """
+        Narrow a scan to one secondary index bucket when the query has an equality on an indexed field.
+        
+        Args:
+            collection_name (str): Collection name
+            query (dict): Query document
+            
+        Returns:
+            iterable: Documents that may match the query
+        """
+        for field, index in self._secondary.get(collection_name, {}).items():
+            value = query.get(field, _MISSING)
+            if value is _MISSING or isinstance(value, dict):
+                continue
+            try:
+                bucket = index.get(value)
+            except TypeError:
+                continue
+            return list(bucket.values()) if bucket else []
+        return self.get_collection(collection_name)
+    
+    def _promote_duplicate(self, collection_name, value):
+        """Re-index the first remaining document with a duplicated primary key value."""
+        duplicates = self._duplicate_keys[collection_name]
+        if value not in duplicates:
+            return
+        key = self.PRIMARY_KEYS[collection_name]
+        matches = [doc for doc in self._documents[collection_name].values() if doc.get(key) == value]
+        if matches:
+            self._primary[collection_name][value] = matches[0]
+        if len(matches) <= 1:
+            duplicates.discard(value)
+    
+    def _primary_lookup(self, collection_name, query):
+        """
+        Resolve an equality query on the collection's primary key from its index.
+        
+        Args:
+            collection_name (str): Collection name
+            query (dict): Query document
+            
+        Returns:
+            tuple: (handled, document); handled is False when the query needs a scan
+        """
+        key = self.PRIMARY_KEYS.get(collection_name)
+        if not query or len(query) != 1 or key not in query or collection_name not in self._primary:
+            return False, None
+        try:
+            if query[key] in self._duplicate_keys[collection_name]:
+                # The index holds only the first of several documents sharing the value
+                return False, None
+            return True, self._primary[collection_name].get(query[key])
+        except TypeError:
+            # Unhashable query value, e.g. an operator document
+            return False, None
+    
+    @staticmethod
+    def _scan(collection, query):
+        """
+        Yield the documents matching every condition of the query.
+        
+        Besides equality, fields may hold comparison operator documents and the query
+        may hold an $expr comparing two fields. Missing fields only match $ne.
+        """
+        items = []
+        predicates = []
+        for key, value in query.items():
+            if key == "$expr":
+                predicates.append(_compile_expr(value))
+            elif _is_operator_document(value):
+                for op, operand in value.items():
+                    if op == "$ne":
+                        predicates.append(lambda item, key=key, operand=operand: item.get(key, _MISSING) != operand)
+                    else:
+                        compare = _COMPARISONS[op]
+                        predicates.append(
+                            lambda item, key=key, operand=operand, compare=compare:
+                                key in item and compare(item[key], operand)
+                        )
+            else:
+                items.append((key, value))
+        items = tuple(items)
+        
+        if not predicates:
+            return (
+                item for item in collection
+                if all(item.get(key, _MISSING) == value for key, value in items)
+            )
+        return (
+            item for item in collection
+            if all(item.get(key, _MISSING) == value for key, value in items)
+            and all(predicate(item) for predicate in predicates)
+        )
+    
+    def collection_version(self, collection_name):
+        """
+        Get the write counter of a collection.
+        
+        Args:
+            collection_name (str): Collection name
+            
+        Returns:
+            int: Number that changes whenever the collection is modified through this handler
+        """
+        return self._versions.get(collection_name, 0)
+    
+    @property
+    def tracks_versions(self):
+        """
+        Whether collection_version sees every write.
+        
+        True for the in-memory collections. A MongoDB server can also be written
+        by other clients, so readers must not cache on versions once connected.
+        """
+        return self.db is None
+    
+    def _bump_version(self, collection_name):
+        """Mark a collection as modified, invalidating caches keyed on its version."""
+        self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+    
+    def as_frame(self, collection_name):
+        """
+        Get a collection as a DataFrame, built once and reused until the next write.
+        
+        Args:
+            collection_name (str): Collection name
+            
+        Returns:
+            pd.DataFrame: Shared frame of the collection; callers must not modify it
+        """
+        if self.db is not None:
+            return pd.DataFrame(self.get_collection(collection_name))
+        
+        version = self.collection_version(collection_name)
+        cached = self._frames.get(collection_name)
+        if cached is None or cached[0] != version:
+            cached = (version, pd.DataFrame(self.get_collection(collection_name)))
+            self._frames[collection_name] = cached
+        return cached[1]
+    
+    def order_items_frame(self):
+        """
+        Get every order item as one long-format row, rebuilt only after orders change
+        (on every call when connected to MongoDB).
+        
+        Returns:
+            pd.DataFrame: Columns order_id, order_date, product_id, quantity, price
+        """
+        version = self.collection_version("orders")
+        cached = self._frames.get("order_items")
+        if not self.tracks_versions or cached is None or cached[0] != version:
+            rows = [
+                (order["id"], order["order_date"], item["product_id"], item["quantity"], item["price"])
+                for order in self.find("orders", projection={"_id": 0, "id": 1, "order_date": 1, "items": 1})
+                for item in order["items"]
+            ]
+            frame = pd.DataFrame(rows, columns=["order_id", "order_date", "product_id", "quantity", "price"])
+            frame["order_date"] = pd.to_datetime(frame["order_date"])
+            cached = (version, frame)
+            self._frames["order_items"] = cached
+        return cached[1]
     
     def get_collection(self, collection_name):
         """Get a collection by name."""
+        if self.db is not None:
+            return list(self.db[collection_name].find({}, _DEFAULT_PROJECTION))
         if collection_name in self.collections:
+            if collection_name in self._stale_views:
+                self.collections[collection_name] = list(self._documents[collection_name].values())
+                self._stale_views.discard(collection_name)
             return self.collections[collection_name]
         return []
     
     def find_one(self, collection_name, query):
         """Find a single document in a collection."""
-        collection = self.get_collection(collection_name)
-        for item in collection:
-            match = True
-            for key, value in query.items():
-                if key not in item or item[key] != value:
-                    match = False
-                    break
-            if match:
-                return item
-        return None
+        if self.db is not None:
+            return self.db[collection_name].find_one(query, _DEFAULT_PROJECTION)
+        
+        handled, document = self._primary_lookup(collection_name, query)
+        if handled:
+            return document
+        
+        return next(self._scan(self._candidates(collection_name, query), query), None)
     
-    def find(self, collection_name, query=None):
-        """Find documents in a collection."""
+    def find(self, collection_name, query=None, projection=None):
+        """
+        Find documents in a collection.
+        
+        Args:
+            collection_name (str): Collection name
+            query (dict, optional): Query document; None returns the whole collection
+            projection (dict, optional): Fields to return when connected to MongoDB
+            
+        Returns:
+            list: Matching documents
+        """
+        if self.db is not None:
+            # Let the server filter (and use its indexes) instead of scanning here
+            return list(self.db[collection_name].find(query or {}, projection or _DEFAULT_PROJECTION))
+        
         collection = self.get_collection(collection_name)
         if query is None:
             return collection
         
-        results = []
-        for item in collection:
-            match = True
-            for key, value in query.items():
-                if key not in item or item[key] != value:
-                    match = False
-                    break
-            if match:
-                results.append(item)
-        return results
+        handled, document = self._primary_lookup(collection_name, query)
+        if handled:
+            return [document] if document is not None else []
+        
+        return list(self._scan(self._candidates(collection_name, query), query))
+    
+    def find_many(self, collection_name, key, values):
+        """
+        Find the documents whose `key` field equals any of the given values.
+        
+        Args:
+            collection_name (str): Collection name
+            key (str): Field to match on
+            values (iterable): Values to look up
+            
+        Returns:
+            dict: Matching document for each found value (first match wins)
+        """
+        wanted = set(values)
+        if self.db is not None:
+            found = {}
+            for item in self.db[collection_name].find({key: {"$in": list(wanted)}}, _DEFAULT_PROJECTION):
+                found.setdefault(item.get(key), item)
+            return found
+        
+        if key == self.PRIMARY_KEYS.get(collection_name) and collection_name in self._primary:
+            index = self._primary[collection_name]
+            return {value: index[value] for value in wanted if value in index}
+        
+        found = {}
+        for item in self.get_collection(collection_name):
+            value = item.get(key)
+            if value in wanted and value not in found:
+                found[value] = item
+        return found
+    
+    def count_documents(self, collection_name, query):
+        """
+        Count the documents matching a query.
+        
+        A single equality on a secondary-indexed field is answered from the index bucket size.
+        
+        Args:
+            collection_name (str): Collection name
+            query (dict): Query document
+            
+        Returns:
+            int: Number of matching documents
+        """
+        if self.db is not None:
+            return self.db[collection_name].count_documents(query)
+        
+        if len(query) == 1:
+            (field, value), = query.items()
+            index = self._secondary.get(collection_name, {}).get(field)
+            if index is not None and not isinstance(value, dict):
+                try:
+                    return len(index.get(value, ()))
+                except TypeError:
+                    pass
+        
+        return sum(1 for _ in self._scan(self._candidates(collection_name, query), query))
+    
+    def distinct(self, collection_name, field):
+        """
+        Get the distinct values of a field across a collection.
+        
+        Args:
+            collection_name (str): Collection name
+            field (str): Field name
+            
+        Returns:
+            list: Distinct values in first-seen order (documents without the field are skipped)
+        """
+        if self.db is not None:
+            return self.db[collection_name].distinct(field)
+        
+        return list(dict.fromkeys(
+            item[field] for item in self.get_collection(collection_name) if field in item
+        ))
     
     def insert_one(self, collection_name, document):
         """Insert a document into a collection."""
+        if self.db is not None:
+            # Insert a copy so Mongo's generated _id isn't added to the caller's dict
+            self.db[collection_name].insert_one(dict(document))
+            self._bump_version(collection_name)
+            return {"inserted_id": document.get("id")}
+        
         if collection_name in self.collections:
-            self.collections[collection_name].append(document)
+            self.get_collection(collection_name).append(document)
+            self._documents[collection_name][id(document)] = document
+            key = self.PRIMARY_KEYS.get(collection_name)
+            if key in document:
+                index = self._primary[collection_name]
+                if document[key] in index:
+                    self._duplicate_keys[collection_name].add(document[key])
+                else:
+                    index[document[key]] = document
+            self._index_secondary(collection_name, document)
+            self._versions[collection_name] += 1
             return {"inserted_id": document.get("id")}
         return None
     
     def update_one(self, collection_name, query, update):
         """Update a document in a collection."""
+        if self.db is not None:
+            result = self.db[collection_name].update_one(query, update)
+            if result.modified_count:
+                self._bump_version(collection_name)
+            return {"modified_count": result.modified_count}
+        
+        if collection_name not in self.collections:
+            return None
+        
+        item = self.find_one(collection_name, query)
+        if item is None:
+            return {"modified_count": 0}
+        
+        self._apply_update(collection_name, item, update)
+        
+        self._versions[collection_name] += 1
+        return {"modified_count": 1}
+    
+    def update_many(self, collection_name, query, update):
+        """
+        Update every matching document in a collection with one call.
+        
+        Besides plain equality, the query may hold a single {"field": {"$in": [...]}} condition.
+        
+        Args:
+            collection_name (str): Collection name
+            query (dict): Query document
+            update (dict): Update document
+            
+        Returns:
+            dict: Number of modified documents, or None for an unknown collection
+        """
+        if self.db is not None:
+            result = self.db[collection_name].update_many(query, update)
+            if result.modified_count:
+                self._bump_version(collection_name)
+            return {"modified_count": result.modified_count}
+        
         if collection_name not in self.collections:
             return None
         
-        for i, item in enumerate(self.collections[collection_name]):
-            match = True
-            for key, value in query.items():
-                if key not in item or item[key] != value:
-                    match = False
-                    break
+        field, condition = next(iter(query.items())) if len(query) == 1 else (None, None)
+        if isinstance(condition, dict) and list(condition) == ["$in"]:
+            wanted = set(condition["$in"])
+            if field == self.PRIMARY_KEYS.get(collection_name) and not wanted & self._duplicate_keys[collection_name]:
+                index = self._primary[collection_name]
+                items = [index[value] for value in wanted if value in index]
+            else:
+                items = [item for item in self.get_collection(collection_name) if item.get(field, _MISSING) in wanted]
+        else:
+            items = list(self._scan(self._candidates(collection_name, query), query))
+        
+        # Like MongoDB, count only documents whose values changed; a no-op
+        # update leaves the collection version (and readers' caches) alone
+        modified = sum(self._apply_update(collection_name, item, update) for item in items)
+        
+        if modified:
+            self._versions[collection_name] += 1
+        return {"modified_count": modified}
+    
+    def bulk_write(self, collection_name, updates):
+        """
+        Apply several single-document updates in one call.
+        
+        Args:
+            collection_name (str): Collection name
+            updates (list): (query, update) pairs, each applied like update_one
             
-            if match:
-                # Apply updates
-                for key, value in update.items():
-                    if key == "$set":
-                        for update_key, update_value in value.items():
-                            item[update_key] = update_value
-                
-                self.collections[collection_name][i] = item
-                return {"modified_count": 1}
-        
-        return {"modified_count": 0}
+        Returns:
+            dict: Number of modified documents, or None for an unknown collection
+        """
+        if not updates:
+            # pymongo rejects an empty batch
+            return {"modified_count": 0}
+        
+        if self.db is not None:
+            result = self.db[collection_name].bulk_write(
+                [pymongo.UpdateOne(query, update) for query, update in updates]
+            )
+            if result.modified_count:
+                self._bump_version(collection_name)
+            return {"modified_count": result.modified_count}
+        
+        if collection_name not in self.collections:
+            return None
+        
+        # As in update_many, count (and bump the version for) real changes only
+        modified = 0
+        for query, update in updates:
+            item = self.find_one(collection_name, query)
+            if item is not None and self._apply_update(collection_name, item, update):
+                modified += 1
+        
+        if modified:
+            self._versions[collection_name] += 1
+        return {"modified_count": modified}
+    
+    def _apply_update(self, collection_name, item, update):
+        """
+        Apply an update document to a stored document, keeping the indices in step.
+        
+        Returns:
+            bool: Whether any field actually changed
+        """
+        key = self.PRIMARY_KEYS.get(collection_name)
+        old_key = item.get(key)
+        old_values = {field: item[field] for field in self._secondary[collection_name] if field in item}
+        modified = False
+        
+        # Apply updates
+        for op, value in update.items():
+            if op == "$set":
+                for update_key, update_value in value.items():
+                    modified = modified or item.get(update_key, _MISSING) != update_value
+                    item[update_key] = update_value
+            elif op == "$inc":
+                for update_key, amount in value.items():
+                    modified = modified or amount != 0 or update_key not in item
+                    item[update_key] = item.get(update_key, 0) + amount
+            elif op == "$push":
+                for update_key, element in value.items():
+                    item.setdefault(update_key, []).append(element)
+                    modified = True
+        
+        # Keep the primary index in step if the key itself changed
+        if key in item and item[key] != old_key:
+            index = self._primary[collection_name]
+            if index.get(old_key) is item:
+                del index[old_key]
+                self._promote_duplicate(collection_name, old_key)
+            if item[key] in index:
+                self._duplicate_keys[collection_name].add(item[key])
+            else:
+                index[item[key]] = item
+        
+        # Move the document between secondary index buckets for changed fields
+        changed = {
+            field for field in self._secondary[collection_name]
+            if item.get(field, _MISSING) != old_values.get(field, _MISSING)
+        }
+        if changed:
+            self._unindex_secondary(
+                collection_name, item, {field: old_values[field] for field in changed if field in old_values}
+            )
+            self._index_secondary(collection_name, item, changed)
+        
+        return modified
     
     def delete_one(self, collection_name, query):
         """Delete a document from a collection."""
+        if self.db is not None:
+            result = self.db[collection_name].delete_one(query)
+            if result.deleted_count:
+                self._bump_version(collection_name)
+            return {"deleted_count": result.deleted_count}
+        
         if collection_name not in self.collections:
             return None
         
-        for i, item in enumerate(self.collections[collection_name]):
-            match = True
-            for key, value in query.items():
-                if key not in item or item[key] != value:
-                    match = False
-                    break
-            
-            if match:
-                del self.collections[collection_name][i]
-                return {"deleted_count": 1}
+        item = self.find_one(collection_name, query)
+        if item is None:
+            return {"deleted_count": 0}
+        
+        # O(1) removal; the list view is rebuilt on its next read
+        del self._documents[collection_name][id(item)]
+        self._stale_views.add(collection_name)
+        self._unindex_secondary(collection_name, item)
+        
+        # Drop the document from the primary index, promoting any duplicate key
+        key = self.PRIMARY_KEYS.get(collection_name)
+        index = self._primary[collection_name]
+        if key in item and index.get(item[key]) is item:
+            del index[item[key]]
+            self._promote_duplicate(collection_name, item[key])
         
-        return {"deleted_count": 0}
\ No newline at end of file
+        self._versions[collection_name] += 1
+        return {"deleted_count": 1}
\ No newline at end of file
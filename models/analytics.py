@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from collections import Counter
 from datetime import datetime, timedelta
 
 class AnalyticsManager:
@@ -8,6 +9,38 @@ class AnalyticsManager:
     def __init__(self, db):
         """Initialize with database connection."""
         self.db = db
+        # One seeded generator for all mock metrics, drawn once in vectorized batches
+        self._rng = np.random.default_rng(42)
+        self._turnover_values = {
+            "monthly": self._rng.uniform(2.0, 4.0, 6).round(2).tolist(),
+            "quarterly": self._rng.uniform(2.0, 4.0, 4).round(2).tolist(),
+            "yearly": self._rng.uniform(2.0, 4.0, 3).round(2).tolist()
+        }
+        # (suppliers version, supplier performance rows)
+        self._supplier_performance_cache = None
+        # (orders collection version, orders DataFrame indexed by order_date)
+        self._orders_cache = None
+        # ((products version, inventory version), category labels, values)
+        self._category_value_cache = None
+    
+    def _orders_frame(self):
+        """
+        Get the orders as a DataFrame indexed by sorted order_date.
+        
+        The frame is rebuilt only when the orders collection has changed, and on
+        every call when connected to MongoDB.
+        
+        Returns:
+            pd.DataFrame: Orders frame (empty if there are no orders)
+        """
+        version = self.db.collection_version("orders")
+        if not self.db.tracks_versions or self._orders_cache is None or self._orders_cache[0] != version:
+            df = self.db.as_frame("orders")
+            if not df.empty:
+                # order_date is stored as datetime, so the column is already datetime64
+                df = df.set_index("order_date").sort_index()
+            self._orders_cache = (version, df)
+        return self._orders_cache[1]
     
     def get_sales_by_period(self, period="monthly", start_date=None, end_date=None):
         """
@@ -15,53 +48,38 @@ class AnalyticsManager:
         
         Args:
             period (str): Period type (daily, weekly, monthly, quarterly)
-            start_date (str, optional): Start date in YYYY-MM-DD format
-            end_date (str, optional): End date in YYYY-MM-DD format
+            start_date (str or date, optional): Start date (YYYY-MM-DD if a string)
+            end_date (str or date, optional): End date (YYYY-MM-DD if a string)
             
         Returns:
             dict: Sales data by period
         """
-        # Get all orders
-        orders = self.db.get_collection("orders")
-        
-        # Filter by date if provided
-        if start_date:
-            orders = [order for order in orders if order["order_date"] >= start_date]
-        
-        if end_date:
-            orders = [order for order in orders if order["order_date"] <= end_date]
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(orders)
+        df = self._orders_frame()
         
         # If no orders, return empty data
         if df.empty:
             return {"labels": [], "values": []}
         
-        # Convert order_date to datetime
-        df["order_date"] = pd.to_datetime(df["order_date"])
-        
-        # Group by period
-        if period == "daily":
-            df["period"] = df["order_date"].dt.strftime("%Y-%m-%d")
-        elif period == "weekly":
-            df["period"] = df["order_date"].dt.strftime("%Y-W%U")
-        elif period == "monthly":
-            df["period"] = df["order_date"].dt.strftime("%Y-%m")
-        elif period == "quarterly":
-            df["period"] = df["order_date"].dt.to_period("Q").astype(str)
-        else:
-            df["period"] = df["order_date"].dt.strftime("%Y-%m")
+        # Filter by date if provided (inclusive slice on the sorted date index)
+        if start_date or end_date:
+            df = df.loc[start_date:end_date]
         
-        # Group by period and sum total_amount
-        sales_by_period = df.groupby("period")["total_amount"].sum().reset_index()
+        # Group by period; W-SAT weeks start on Sunday, matching the %U labels
+        freq, label_format = {
+            "daily": ("D", "%Y-%m-%d"),
+            "weekly": ("W-SAT", "%Y-W%U"),
+            "quarterly": ("Q", None)
+        }.get(period, ("M", "%Y-%m"))
+        sales_by_period = df["total_amount"].groupby(df.index.to_period(freq)).sum()
         
-        # Sort by period
-        sales_by_period = sales_by_period.sort_values("period")
+        if label_format is None:
+            labels = sales_by_period.index.astype(str)
+        else:
+            labels = sales_by_period.index.start_time.strftime(label_format)
         
         return {
-            "labels": sales_by_period["period"].tolist(),
-            "values": sales_by_period["total_amount"].tolist()
+            "labels": labels.tolist(),
+            "values": sales_by_period.tolist()
         }
     
     def get_top_selling_products(self, limit=10, start_date=None, end_date=None):
@@ -70,53 +88,35 @@ class AnalyticsManager:
         
         Args:
             limit (int, optional): Number of products to return
-            start_date (str, optional): Start date in YYYY-MM-DD format
-            end_date (str, optional): End date in YYYY-MM-DD format
+            start_date (str or date, optional): Start date (YYYY-MM-DD if a string)
+            end_date (str or date, optional): End date (YYYY-MM-DD if a string)
             
         Returns:
             list: Top selling products
         """
-        # Get all orders
-        orders = self.db.get_collection("orders")
+        # All order items in long format, one row per item
+        df = self.db.order_items_frame()
         
         # Filter by date if provided
         if start_date:
-            orders = [order for order in orders if order["order_date"] >= start_date]
+            df = df[df["order_date"] >= pd.Timestamp(start_date)]
         
         if end_date:
-            orders = [order for order in orders if order["order_date"] <= end_date]
+            df = df[df["order_date"] <= pd.Timestamp(end_date)]
         
-        # Extract items from orders
-        items = []
-        for order in orders:
-            for item in order["items"]:
-                items.append(item)
+        # Sum quantity per product and keep the top N (ties in first-seen order)
+        product_sales = df.groupby("product_id", sort=False)["quantity"].sum().nlargest(limit)
         
-        # Convert to DataFrame
-        df = pd.DataFrame(items)
-        
-        # If no items, return empty list
-        if df.empty:
-            return []
-        
-        # Group by product_id and sum quantity
-        product_sales = df.groupby("product_id")["quantity"].sum().reset_index()
-        
-        # Sort by quantity in descending order
-        product_sales = product_sales.sort_values("quantity", ascending=False)
-        
-        # Limit to top N products
-        product_sales = product_sales.head(limit)
-        
-        # Get product details
+        # Get product details in one batch lookup
+        products = self.db.find_many("products", "id", product_sales.index)
         top_products = []
-        for _, row in product_sales.iterrows():
-            product = self.db.find_one("products", {"id": row["product_id"]})
+        for product_id, quantity in product_sales.items():
+            product = products.get(product_id)
             if product:
                 top_products.append({
                     "id": product["id"],
                     "name": product["name"],
-                    "quantity_sold": int(row["quantity"]),
+                    "quantity_sold": int(quantity),
                     "category": product["category"]
                 })
         
@@ -129,39 +129,35 @@ class AnalyticsManager:
         Returns:
             dict: Inventory value by category
         """
-        # Get all products
-        products = self.db.get_collection("products")
-        
-        # Get all inventory
-        inventory = self.db.get_collection("inventory")
-        
-        # Create product lookup dictionary
-        product_dict = {product["id"]: product for product in products}
-        
-        # Calculate inventory value by category
-        category_values = {}
-        
-        for item in inventory:
-            product_id = item["product_id"]
-            quantity = item["quantity"]
+        versions = (self.db.collection_version("products"), self.db.collection_version("inventory"))
+        if (not self.db.tracks_versions or self._category_value_cache is None
+                or self._category_value_cache[0] != versions):
+            products = self.db.as_frame("products")
+            inventory = self.db.as_frame("inventory")
             
-            if product_id in product_dict:
-                product = product_dict[product_id]
-                category = product["category"]
-                value = product["price"] * quantity
-                
-                if category in category_values:
-                    category_values[category] += value
-                else:
-                    category_values[category] = value
+            if products.empty or inventory.empty:
+                categories, values = [], []
+            else:
+                # Join inventory to product prices and sum value per category,
+                # keeping categories in first-seen inventory order
+                joined = inventory[["product_id", "quantity"]].merge(
+                    products[["id", "price", "category"]],
+                    left_on="product_id",
+                    right_on="id"
+                )
+                category_values = (joined["price"] * joined["quantity"]).groupby(
+                    joined["category"], sort=False
+                ).sum()
+                categories = category_values.index.tolist()
+                values = category_values.tolist()
+            
+            self._category_value_cache = (versions, categories, values)
         
-        # Convert to lists for charts
-        categories = list(category_values.keys())
-        values = list(category_values.values())
+        _, categories, values = self._category_value_cache
         
         return {
-            "labels": categories,
-            "values": values
+            "labels": list(categories),
+            "values": list(values)
         }
     
     def get_order_status_distribution(self):
@@ -174,16 +170,8 @@ class AnalyticsManager:
         # Get all orders
         orders = self.db.get_collection("orders")
         
-        # Count orders by status
-        status_counts = {}
-        
-        for order in orders:
-            status = order["status"]
-            
-            if status in status_counts:
-                status_counts[status] += 1
-            else:
-                status_counts[status] = 1
+        # Count orders by status (first-seen order, like the old dict accumulator)
+        status_counts = Counter(order["status"] for order in orders)
         
         # Convert to lists for charts
         statuses = list(status_counts.keys())
@@ -210,7 +198,7 @@ class AnalyticsManager:
         if period == "monthly":
             # Last 6 months
             periods = [(today - timedelta(days=30 * i)).strftime("%Y-%m") for i in range(6, 0, -1)]
-            values = [round(np.random.uniform(2.0, 4.0), 2) for _ in range(6)]
+            values = list(self._turnover_values["monthly"])
         elif period == "quarterly":
             # Last 4 quarters
             current_quarter = (today.month - 1) // 3 + 1
@@ -223,11 +211,11 @@ class AnalyticsManager:
                 q = q + 4 if q <= 0 else q
                 periods.append(f"{y}-Q{q}")
             
-            values = [round(np.random.uniform(2.0, 4.0), 2) for _ in range(4)]
+            values = list(self._turnover_values["quarterly"])
         else:  # yearly
             # Last 3 years
             periods = [(today - timedelta(days=365 * i)).strftime("%Y") for i in range(3, 0, -1)]
-            values = [round(np.random.uniform(2.0, 4.0), 2) for _ in range(3)]
+            values = list(self._turnover_values["yearly"])
         
         return {
             "labels": periods,
@@ -241,20 +229,33 @@ class AnalyticsManager:
         Returns:
             list: Supplier performance data
         """
-        # Get all suppliers
-        suppliers = self.db.get_collection("suppliers")
-        
-        # Mock performance data
-        performance_data = []
-        
-        for supplier in suppliers:
-            performance_data.append({
-                "id": supplier["id"],
-                "name": supplier["name"],
-                "on_time_delivery_rate": round(np.random.uniform(0.8, 0.99), 2),
-                "quality_rating": round(np.random.uniform(3.0, 5.0), 1),
-                "response_time": round(np.random.uniform(1.0, 5.0), 1),
-                "lead_time": round(np.random.uniform(2.0, 14.0), 1)
-            })
+        version = self.db.collection_version("suppliers")
+        if self._supplier_performance_cache is None or self._supplier_performance_cache[0] != version:
+            # Get all suppliers
+            suppliers = self.db.get_collection("suppliers")
+            
+            # Mock performance data: one draw for every supplier and metric
+            # (on-time delivery rate, quality rating, response time, lead time)
+            samples = self._rng.uniform(
+                [0.8, 3.0, 1.0, 2.0],
+                [0.99, 5.0, 5.0, 14.0],
+                size=(len(suppliers), 4)
+            )
+            samples[:, 0] = samples[:, 0].round(2)
+            samples[:, 1:] = samples[:, 1:].round(1)
+            
+            performance_data = []
+            
+            for supplier, (on_time, quality, response, lead) in zip(suppliers, samples.tolist()):
+                performance_data.append({
+                    "id": supplier["id"],
+                    "name": supplier["name"],
+                    "on_time_delivery_rate": on_time,
+                    "quality_rating": quality,
+                    "response_time": response,
+                    "lead_time": lead
+                })
+            
+            self._supplier_performance_cache = (version, performance_data)
         
-        return performance_data
\ No newline at end of file
+        return [dict(row) for row in self._supplier_performance_cache[1]]
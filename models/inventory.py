@@ -1,4 +1,14 @@
+import math
 import numpy as np
+from statistics import NormalDist
+
+# Standard normal distribution, for service level Z-scores
+STANDARD_NORMAL = NormalDist()
+
+# JIT score points per criterion label; unlisted labels score the fallback
+JIT_DEMAND_STABILITY_POINTS = {"High": 40, "Medium": 30}
+JIT_LEAD_TIME_POINTS = {"1 day": 30, "2 days": 25, "3 days": 20}
+JIT_SUPPLIER_RELIABILITY_POINTS = {"Excellent": 30, "Good": 25}
 
 class InventoryManager:
     """Manages inventory operations including ABC analysis, JIT, EOQ, FIFO, and Safety Stock."""
@@ -6,6 +16,8 @@ class InventoryManager:
     def __init__(self, db):
         """Initialize with database connection."""
         self.db = db
+        # ((inventory version, products version), column arrays of the valued inventory)
+        self._soa_cache = None
     
     def get_all_inventory(self):
         """Get all inventory items."""
@@ -17,26 +29,48 @@ class InventoryManager:
     
     def update_inventory(self, product_id, quantity_change):
         """Update inventory quantity."""
-        inventory = self.get_inventory_by_product(product_id)
-        if inventory:
-            new_quantity = inventory["quantity"] + quantity_change
-            self.db.update_one(
-                "inventory",
-                {"product_id": product_id},
-                {"$set": {"quantity": new_quantity}}
-            )
-            return True
-        return False
+        result = self.db.update_one(
+            "inventory",
+            {"product_id": product_id},
+            {"$inc": {"quantity": quantity_change}}
+        )
+        return result["modified_count"] > 0
     
     def get_low_stock_items(self):
         """Get items with stock below reorder point."""
-        inventory = self.get_all_inventory()
-        return [item for item in inventory if item["quantity"] <= item["reorder_point"]]
+        return self.db.find("inventory", {"$expr": {"$lte": ["$quantity", "$reorder_point"]}})
     
     def get_out_of_stock_items(self):
         """Get items with zero stock."""
-        inventory = self.get_all_inventory()
-        return [item for item in inventory if item["quantity"] == 0]
+        return self.db.find("inventory", {"quantity": 0})
+    
+    def _refresh_soa(self):
+        """
+        Get the inventory items that have a product as parallel NumPy columns.
+        
+        The arrays are rebuilt only when the inventory or products collection has changed,
+        and on every call when connected to MongoDB.
+        
+        Returns:
+            dict: Aligned product_ids (object), quantities (int64) and prices (float64) arrays
+        """
+        versions = (self.db.collection_version("inventory"), self.db.collection_version("products"))
+        if not self.db.tracks_versions or self._soa_cache is None or self._soa_cache[0] != versions:
+            inventory = self.get_all_inventory()
+            # One batch lookup instead of scanning the products per inventory item
+            products = self.db.find_many("products", "id", (inv_item["product_id"] for inv_item in inventory))
+            valued = [inv_item for inv_item in inventory if inv_item["product_id"] in products]
+            count = len(valued)
+            
+            columns = {
+                "product_ids": np.array([inv_item["product_id"] for inv_item in valued], dtype=object),
+                "quantities": np.fromiter((inv_item["quantity"] for inv_item in valued), dtype=np.int64, count=count),
+                "prices": np.fromiter(
+                    (products[inv_item["product_id"]]["price"] for inv_item in valued), dtype=np.float64, count=count
+                )
+            }
+            self._soa_cache = (versions, columns)
+        return self._soa_cache[1]
     
     def perform_abc_analysis(self):
         """
@@ -45,56 +79,34 @@ class InventoryManager:
         Returns:
             dict: Dictionary with A, B, and C category items
         """
-        inventory = self.get_all_inventory()
-        products = self.db.get_collection("products")
+        # Parallel arrays of the inventory items that have a product
+        columns = self._refresh_soa()
+        product_ids = columns["product_ids"]
         
-        # Calculate value for each inventory item
-        inventory_values = []
-        for inv_item in inventory:
-            product = next((p for p in products if p["id"] == inv_item["product_id"]), None)
-            if product:
-                value = inv_item["quantity"] * product["price"]
-                inventory_values.append({
-                    "product_id": inv_item["product_id"],
-                    "value": value,
-                    "quantity": inv_item["quantity"]
-                })
+        # Value per item, sorted in descending order (stable, so ties keep inventory order)
+        values = columns["quantities"] * columns["prices"]
+        order = np.argsort(-values, kind="stable")
+        product_ids = product_ids[order]
         
-        # Sort by value in descending order
-        inventory_values.sort(key=lambda x: x["value"], reverse=True)
+        # Cumulative percentage of the total value, classified at 80% and 95%
+        cumulative_value = np.cumsum(values[order])
+        cumulative_percentage = cumulative_value / cumulative_value[-1] * 100 if len(values) else cumulative_value
         
-        # Calculate cumulative percentage
-        total_value = sum(item["value"] for item in inventory_values)
-        cumulative_value = 0
+        # The cumulative curve is sorted, so each cutoff is one binary search
+        a_end = np.searchsorted(cumulative_percentage, 80, side="right")
+        b_end = np.searchsorted(cumulative_percentage, 95, side="right")
         
-        a_items = []
-        b_items = []
-        c_items = []
+        a_items = product_ids[:a_end].tolist()
+        b_items = product_ids[a_end:b_end].tolist()
+        c_items = product_ids[b_end:].tolist()
         
-        for item in inventory_values:
-            cumulative_value += item["value"]
-            cumulative_percentage = (cumulative_value / total_value) * 100
-            
-            if cumulative_percentage <= 80:
-                a_items.append(item["product_id"])
-                self.db.update_one(
+        # Store the categories with one bulk write per category
+        for category, product_ids in (("A", a_items), ("B", b_items), ("C", c_items)):
+            if product_ids:
+                self.db.update_many(
                     "inventory",
-                    {"product_id": item["product_id"]},
-                    {"$set": {"abc_category": "A"}}
-                )
-            elif cumulative_percentage <= 95:
-                b_items.append(item["product_id"])
-                self.db.update_one(
-                    "inventory",
-                    {"product_id": item["product_id"]},
-                    {"$set": {"abc_category": "B"}}
-                )
-            else:
-                c_items.append(item["product_id"])
-                self.db.update_one(
-                    "inventory",
-                    {"product_id": item["product_id"]},
-                    {"$set": {"abc_category": "C"}}
+                    {"product_id": {"$in": product_ids}},
+                    {"$set": {"abc_category": category}}
                 )
         
         return {
@@ -116,7 +128,7 @@ class InventoryManager:
         Returns:
             dict: EOQ results
         """
-        eoq = round(np.sqrt((2 * annual_demand * order_cost) / holding_cost))
+        eoq = round(math.sqrt((2 * annual_demand * order_cost) / holding_cost))
         optimal_orders = round(annual_demand / eoq)
         total_order_cost = optimal_orders * order_cost
         total_holding_cost = (eoq / 2) * holding_cost
@@ -131,6 +143,61 @@ class InventoryManager:
             "total_cost": total_cost
         }
     
+    def calculate_eoq_batch(self, product_ids, annual_demand, order_cost, holding_cost):
+        """
+        Calculate Economic Order Quantity for many products in one vectorized pass.
+        
+        Args:
+            product_ids (list): Product IDs
+            annual_demand (array-like): Annual demand quantity per product
+            order_cost (array-like or float): Cost per order
+            holding_cost (array-like or float): Annual holding cost per unit
+            
+        Returns:
+            list: EOQ results, one dict per product as returned by calculate_eoq; products
+            whose inputs give no finite, positive EOQ (e.g. zero demand or zero holding
+            cost) get None for every computed field
+        """
+        annual_demand = np.asarray(annual_demand, dtype=np.float64)
+        order_cost = np.broadcast_to(np.asarray(order_cost, dtype=np.float64), annual_demand.shape)
+        holding_cost = np.broadcast_to(np.asarray(holding_cost, dtype=np.float64), annual_demand.shape)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eoq = np.round(np.sqrt((2 * annual_demand * order_cost) / holding_cost))
+            valid = np.isfinite(eoq) & (eoq > 0)
+            # Placeholder for invalid rows so the divisions below stay finite
+            eoq = np.where(valid, eoq, 1.0)
+            optimal_orders = np.round(annual_demand / eoq)
+            total_order_cost = optimal_orders * order_cost
+            total_holding_cost = (eoq / 2) * holding_cost
+            total_cost = total_order_cost + total_holding_cost
+        valid &= np.isfinite(total_cost)
+        
+        return [
+            {
+                "product_id": product_id,
+                "eoq": int(row[0]),
+                "optimal_orders": int(row[1]),
+                "total_order_cost": row[2],
+                "total_holding_cost": row[3],
+                "total_cost": row[4]
+            }
+            if is_valid else
+            {
+                "product_id": product_id,
+                "eoq": None,
+                "optimal_orders": None,
+                "total_order_cost": None,
+                "total_holding_cost": None,
+                "total_cost": None
+            }
+            for product_id, is_valid, row in zip(
+                product_ids,
+                valid.tolist(),
+                np.column_stack([eoq, optimal_orders, total_order_cost, total_holding_cost, total_cost]).tolist()
+            )
+        ]
+    
     def calculate_safety_stock(self, product_id, avg_daily_demand, std_dev_demand, avg_lead_time, std_dev_lead_time, service_level=95):
         """
         Calculate safety stock level.
@@ -141,29 +208,17 @@ class InventoryManager:
             std_dev_demand (float): Standard deviation of daily demand
             avg_lead_time (float): Average lead time in days
             std_dev_lead_time (float): Standard deviation of lead time
-            service_level (int): Service level percentage (default: 95)
+            service_level (float): Service level percentage, between 0 and 100 exclusive (default: 95)
             
         Returns:
             dict: Safety stock results
         """
-        # Service level Z-score mapping
-        z_scores = {
-            80: 0.84,
-            85: 1.04,
-            90: 1.28,
-            95: 1.65,
-            96: 1.75,
-            97: 1.88,
-            98: 2.05,
-            99: 2.33
-        }
-        
-        # Get closest z-score
-        z_score = z_scores.get(service_level, 1.65)
+        # Z-score of the service level (inverse standard normal CDF)
+        z_score = STANDARD_NORMAL.inv_cdf(service_level / 100)
         
         # Calculate safety stock
         demand_during_lead_time = avg_daily_demand * avg_lead_time
-        std_dev_during_lead_time = np.sqrt(
+        std_dev_during_lead_time = math.sqrt(
             (avg_lead_time * std_dev_demand**2) + 
             (avg_daily_demand**2 * std_dev_lead_time**2)
         )
@@ -185,6 +240,67 @@ class InventoryManager:
             "service_level": service_level
         }
     
+    def calculate_safety_stock_batch(self, product_ids, avg_daily_demand, std_dev_demand, avg_lead_time, std_dev_lead_time, service_level=95):
+        """
+        Calculate safety stock levels for many products in one vectorized pass.
+        
+        The inventory entries are updated with one bulk write.
+        
+        Args:
+            product_ids (list): Product IDs
+            avg_daily_demand (array-like): Average daily demand per product
+            std_dev_demand (array-like or float): Standard deviation of daily demand
+            avg_lead_time (array-like or float): Average lead time in days
+            std_dev_lead_time (array-like or float): Standard deviation of lead time
+            service_level (float): Service level percentage, between 0 and 100 exclusive (default: 95)
+            
+        Returns:
+            list: Safety stock results, one dict per product as returned by calculate_safety_stock;
+            products whose inputs give no finite result (e.g. a negative lead time) get None
+            and their inventory entry is left unchanged
+        """
+        z_score = STANDARD_NORMAL.inv_cdf(service_level / 100)
+        avg_daily_demand = np.asarray(avg_daily_demand, dtype=np.float64)
+        std_dev_demand = np.asarray(std_dev_demand, dtype=np.float64)
+        avg_lead_time = np.asarray(avg_lead_time, dtype=np.float64)
+        std_dev_lead_time = np.asarray(std_dev_lead_time, dtype=np.float64)
+        
+        # Calculate safety stock
+        with np.errstate(invalid="ignore"):
+            demand_during_lead_time = avg_daily_demand * avg_lead_time
+            std_dev_during_lead_time = np.sqrt(
+                (avg_lead_time * std_dev_demand**2) +
+                (avg_daily_demand**2 * std_dev_lead_time**2)
+            )
+            safety_stock = np.round(z_score * std_dev_during_lead_time)
+            reorder_point = np.round(demand_during_lead_time + safety_stock)
+        safety_stock, reorder_point = np.broadcast_arrays(safety_stock, reorder_point)
+        valid = np.isfinite(safety_stock) & np.isfinite(reorder_point)
+        safety_stock = np.where(valid, safety_stock, 0).astype(int).tolist()
+        reorder_point = np.where(valid, reorder_point, 0).astype(int).tolist()
+        
+        results = []
+        updates = []
+        for product_id, is_valid, stock, point in zip(product_ids, valid.tolist(), safety_stock, reorder_point):
+            if is_valid:
+                updates.append((
+                    {"product_id": product_id},
+                    {"$set": {"safety_stock": stock, "reorder_point": point}}
+                ))
+            else:
+                stock = point = None
+            results.append({
+                "product_id": product_id,
+                "safety_stock": stock,
+                "reorder_point": point,
+                "service_level": service_level
+            })
+        
+        # Update inventory with the new safety stocks and reorder points in one call
+        self.db.bulk_write("inventory", updates)
+        
+        return results
+    
     def get_jit_candidates(self):
         """
         Identify products suitable for Just-in-Time inventory management.
@@ -193,12 +309,12 @@ class InventoryManager:
             list: List of products suitable for JIT
         """
         inventory = self.get_all_inventory()
-        products = self.db.get_collection("products")
+        products = self.db.find_many("products", "id", (inv_item["product_id"] for inv_item in inventory))
         
         jit_candidates = []
         
         for inv_item in inventory:
-            product = next((p for p in products if p["id"] == inv_item["product_id"]), None)
+            product = products.get(inv_item["product_id"])
             if product:
                 # Mock criteria for JIT suitability
                 # In a real system, this would use actual demand stability, lead time, etc.
@@ -207,29 +323,11 @@ class InventoryManager:
                 supplier_reliability = "Excellent" if inv_item["product_id"] in ["P001", "P003"] else "Good"
                 
                 # Calculate JIT score (mock calculation)
-                jit_score = 0
-                if demand_stability == "High":
-                    jit_score += 40
-                elif demand_stability == "Medium":
-                    jit_score += 30
-                else:
-                    jit_score += 10
-                
-                if lead_time == "1 day":
-                    jit_score += 30
-                elif lead_time == "2 days":
-                    jit_score += 25
-                elif lead_time == "3 days":
-                    jit_score += 20
-                else:
-                    jit_score += 10
-                
-                if supplier_reliability == "Excellent":
-                    jit_score += 30
-                elif supplier_reliability == "Good":
-                    jit_score += 25
-                else:
-                    jit_score += 15
+                jit_score = (
+                    JIT_DEMAND_STABILITY_POINTS.get(demand_stability, 10)
+                    + JIT_LEAD_TIME_POINTS.get(lead_time, 10)
+                    + JIT_SUPPLIER_RELIABILITY_POINTS.get(supplier_reliability, 15)
+                )
                 
                 jit_candidates.append({
                     "product": product["name"],
@@ -1,4 +1,37 @@
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+
+# Ordinal code per order status, in fulfilment order; unknown statuses are 0
+_STATUS_CODES = {
+    "Processing": 1,
+    "Shipped": 2,
+    "In Transit": 3,
+    "Out for Delivery": 4,
+    "Delivered": 5,
+    "Cancelled": 9
+}
+
+# Mock tracking schedule: (lowest and highest status code showing the event,
+# days after order, time, event, location)
+_TRACKING_SCHEDULE = (
+    (0, 9, 0, "10:30 AM", "Order Placed", "Online"),
+    (0, 5, 1, "09:15 AM", "Order Processed", "Warehouse, Chicago"),
+    (2, 5, 2, "02:45 PM", "Shipped", "Warehouse, Chicago"),
+    (3, 5, 4, "11:20 AM", "In Transit", "Distribution Center, Atlanta"),
+    (4, 5, 6, "08:30 AM", "Out for Delivery", "Local Delivery Center"),
+    (5, 5, 6, "03:45 PM", "Delivered", None),
+    (9, 9, 1, "11:30 AM", "Cancelled", "Online")
+)
+
+# Current location shown for each order status
+_CURRENT_LOCATIONS = {
+    "Processing": "Warehouse, Chicago",
+    "Shipped": "Warehouse, Chicago",
+    "In Transit": "Distribution Center, Atlanta",
+    "Out for Delivery": "Local Delivery Center",
+    "Delivered": "Delivered to recipient",
+    "Cancelled": "Order Cancelled"
+}
 
 class OrderManager:
     """Manages order operations including creation, tracking, and updates."""
@@ -6,6 +39,9 @@ class OrderManager:
     def __init__(self, db):
         """Initialize with database connection."""
         self.db = db
+        # Orders created so far, for O(1) ID generation; the lock keeps IDs unique across threads
+        self._order_counter = len(self.db.get_collection("orders"))
+        self._order_id_lock = threading.Lock()
     
     def get_all_orders(self):
         """Get all orders."""
@@ -16,9 +52,13 @@ class OrderManager:
         return self.db.find_one("orders", {"id": order_id})
     
     def get_orders_by_status(self, status):
-        """Get orders by status."""
+        """Get orders by status (served from the status index)."""
         return self.db.find("orders", {"status": status})
     
+    def count_orders_by_status(self, status):
+        """Count orders with a status without fetching them."""
+        return self.db.count_documents("orders", {"status": status})
+    
     def create_order(self, customer_id, items, shipping_address):
         """
         Create a new order.
@@ -31,30 +71,32 @@ class OrderManager:
         Returns:
             dict: Created order or None if failed
         """
-        # Generate order ID
-        order_count = len(self.get_all_orders())
-        order_id = f"ORD-{12350 + order_count}"
+        # Look up every product and inventory row in one batch each
+        product_ids = [item["product_id"] for item in items]
+        products = self.db.find_many("products", "id", product_ids)
+        inventories = self.db.find_many("inventory", "product_id", product_ids)
+        
+        # Check inventory for the total requested per product before changing anything
+        requested = {}
+        for item in items:
+            requested[item["product_id"]] = requested.get(item["product_id"], 0) + item["quantity"]
+        for product_id, quantity in requested.items():
+            inventory = inventories.get(product_id)
+            if product_id not in products or not inventory or inventory["quantity"] < quantity:
+                return None
+        
+        # Update inventory in one bulk write
+        self.db.bulk_write("inventory", [
+            ({"product_id": product_id}, {"$inc": {"quantity": -quantity}})
+            for product_id, quantity in requested.items()
+        ])
         
         # Calculate total amount
         total_amount = 0
         order_items = []
         
         for item in items:
-            product = self.db.find_one("products", {"id": item["product_id"]})
-            if not product:
-                return None
-            
-            # Check inventory
-            inventory = self.db.find_one("inventory", {"product_id": item["product_id"]})
-            if not inventory or inventory["quantity"] < item["quantity"]:
-                return None
-            
-            # Update inventory
-            self.db.update_one(
-                "inventory",
-                {"product_id": item["product_id"]},
-                {"$set": {"quantity": inventory["quantity"] - item["quantity"]}}
-            )
+            product = products[item["product_id"]]
             
             # Add to order items
             item_total = product["price"] * item["quantity"]
@@ -66,34 +108,31 @@ class OrderManager:
             
             total_amount += item_total
         
-        # Create order
+        # Create order, reading the clock once
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         order = {
-            "id": order_id,
             "customer_id": customer_id,
-            "order_date": datetime.now().strftime("%Y-%m-%d"),
+            "order_date": today,
             "status": "Processing",
-            "estimated_delivery": (datetime.now().replace(day=datetime.now().day + 7)).strftime("%Y-%m-%d"),
+            "estimated_delivery": (today + timedelta(days=7)).strftime("%Y-%m-%d"),
             "items": order_items,
             "shipping_address": shipping_address,
             "total_amount": total_amount
         }
         
-        # Insert order
-        self.db.insert_one("orders", order)
-        
-        # Update customer order history
-        customer = self.db.find_one("customers", {"id": customer_id})
-        if customer:
-            if "order_history" not in customer:
-                customer["order_history"] = []
-            
-            customer["order_history"].append(order_id)
-            
-            self.db.update_one(
-                "customers",
-                {"id": customer_id},
-                {"$set": {"order_history": customer["order_history"]}}
-            )
+        # Generate order ID and insert order
+        with self._order_id_lock:
+            order_id = f"ORD-{12350 + self._order_counter}"
+            order = {"id": order_id, **order}
+            self.db.insert_one("orders", order)
+            self._order_counter += 1
+        
+        # Append to customer order history
+        self.db.update_one(
+            "customers",
+            {"id": customer_id},
+            {"$push": {"order_history": order_id}}
+        )
         
         return order
     
@@ -147,13 +186,11 @@ class OrderManager:
         
         # Return items to inventory
         for item in order["items"]:
-            inventory = self.db.find_one("inventory", {"product_id": item["product_id"]})
-            if inventory:
-                self.db.update_one(
-                    "inventory",
-                    {"product_id": item["product_id"]},
-                    {"$set": {"quantity": inventory["quantity"] + item["quantity"]}}
-                )
+            self.db.update_one(
+                "inventory",
+                {"product_id": item["product_id"]},
+                {"$inc": {"quantity": item["quantity"]}}
+            )
         
         # Update order status
         result = self.db.update_one(
@@ -178,88 +215,27 @@ class OrderManager:
         if not order:
             return None
         
-        # Mock tracking events based on order status
+        # Mock tracking events based on order status, dated from the order date
+        base_date = order["order_date"]
+        code = _STATUS_CODES.get(order["status"], 0)
         tracking_events = []
         
-        # Order placed event
-        tracking_events.append({
-            "date": order["order_date"],
-            "time": "10:30 AM",
-            "event": "Order Placed",
-            "location": "Online"
-        })
-        
-        # Order processed event
-        if order["status"] != "Cancelled":
-            process_date = datetime.strptime(order["order_date"], "%Y-%m-%d")
-            process_date = process_date.replace(day=process_date.day + 1)
-            
-            tracking_events.append({
-                "date": process_date.strftime("%Y-%m-%d"),
-                "time": "09:15 AM",
-                "event": "Order Processed",
-                "location": "Warehouse, Chicago"
-            })
-        
-        # Shipped event
-        if order["status"] in ["Shipped", "In Transit", "Out for Delivery", "Delivered"]:
-            ship_date = datetime.strptime(order["order_date"], "%Y-%m-%d")
-            ship_date = ship_date.replace(day=ship_date.day + 2)
-            
-            tracking_events.append({
-                "date": ship_date.strftime("%Y-%m-%d"),
-                "time": "02:45 PM",
-                "event": "Shipped",
-                "location": "Warehouse, Chicago"
-            })
-        
-        # In Transit event
-        if order["status"] in ["In Transit", "Out for Delivery", "Delivered"]:
-            transit_date = datetime.strptime(order["order_date"], "%Y-%m-%d")
-            transit_date = transit_date.replace(day=transit_date.day + 4)
-            
-            tracking_events.append({
-                "date": transit_date.strftime("%Y-%m-%d"),
-                "time": "11:20 AM",
-                "event": "In Transit",
-                "location": "Distribution Center, Atlanta"
-            })
-        
-        # Out for Delivery event
-        if order["status"] in ["Out for Delivery", "Delivered"]:
-            delivery_date = datetime.strptime(order["order_date"], "%Y-%m-%d")
-            delivery_date = delivery_date.replace(day=delivery_date.day + 6)
-            
-            tracking_events.append({
-                "date": delivery_date.strftime("%Y-%m-%d"),
-                "time": "08:30 AM",
-                "event": "Out for Delivery",
-                "location": "Local Delivery Center"
-            })
-        
-        # Delivered event
-        if order["status"] == "Delivered":
-            delivered_date = order.get("delivery_date", datetime.strptime(order["order_date"], "%Y-%m-%d").replace(day=datetime.strptime(order["order_date"], "%Y-%m-%d").day + 6).strftime("%Y-%m-%d"))
-            
-            tracking_events.append({
-                "date": delivered_date,
-                "time": "03:45 PM",
-                "event": "Delivered",
-                "location": order["shipping_address"]
-            })
-        
-        # Cancelled event
-        if order["status"] == "Cancelled":
-            cancel_date = datetime.strptime(order["order_date"], "%Y-%m-%d")
-            cancel_date = cancel_date.replace(day=cancel_date.day + 1)
-            
-            tracking_events.append({
-                "date": cancel_date.strftime("%Y-%m-%d"),
-                "time": "11:30 AM",
-                "event": "Cancelled",
-                "location": "Online",
-                "reason": order.get("cancellation_reason", "No reason provided")
-            })
+        for min_code, max_code, offset, time, event, location in _TRACKING_SCHEDULE:
+            if not min_code <= code <= max_code:
+                continue
+            
+            tracking_event = {
+                "date": (base_date + timedelta(days=offset)).strftime("%Y-%m-%d"),
+                "time": time,
+                "event": event,
+                "location": location
+            }
+            if event == "Delivered":
+                tracking_event["date"] = order.get("delivery_date", tracking_event["date"])
+                tracking_event["location"] = order["shipping_address"]
+            elif event == "Cancelled":
+                tracking_event["reason"] = order.get("cancellation_reason", "No reason provided")
+            tracking_events.append(tracking_event)
         
         return {
             "order_id": order_id,
@@ -271,17 +247,4 @@ class OrderManager:
     
     def _get_current_location(self, status):
         """Get current location based on order status."""
-        if status == "Processing":
-            return "Warehouse, Chicago"
-        elif status == "Shipped":
-            return "Warehouse, Chicago"
-        elif status == "In Transit":
-            return "Distribution Center, Atlanta"
-        elif status == "Out for Delivery":
-            return "Local Delivery Center"
-        elif status == "Delivered":
-            return "Delivered to recipient"
-        elif status == "Cancelled":
-            return "Order Cancelled"
-        else:
-            return "Unknown"
\ No newline at end of file
+        return _CURRENT_LOCATIONS.get(status, "Unknown")
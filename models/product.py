@@ -1,9 +1,18 @@
+import threading
+
 class ProductManager:
     """Manages product operations including creation, updates, and retrieval."""
     
     def __init__(self, db):
         """Initialize with database connection."""
         self.db = db
+        # Products created so far, for O(1) ID generation; the lock keeps IDs unique across threads
+        self._product_counter = len(self.db.get_collection("products"))
+        self._product_id_lock = threading.Lock()
+        # (products version, sorted categories)
+        self._categories_cache = None
+        # threshold -> ((inventory version, products version), low stock rows)
+        self._low_stock_cache = {}
     
     def get_all_products(self):
         """Get all products."""
@@ -36,13 +45,8 @@ class ProductManager:
         Returns:
             dict: Created product or None if failed
         """
-        # Generate product ID
-        product_count = len(self.get_all_products())
-        product_id = f"PRD-{10000 + product_count}"
-        
         # Create product
         product = {
-            "id": product_id,
             "name": name,
             "description": description,
             "price": price,
@@ -51,8 +55,12 @@ class ProductManager:
             "image_url": image_url or f"https://via.placeholder.com/150?text={name.replace(' ', '+')}"
         }
         
-        # Insert product
-        self.db.insert_one("products", product)
+        # Generate product ID and insert product
+        with self._product_id_lock:
+            product_id = f"PRD-{10000 + self._product_counter}"
+            product = {"id": product_id, **product}
+            self.db.insert_one("products", product)
+            self._product_counter += 1
         
         # Create initial inventory entry
         self.db.insert_one("inventory", {
@@ -109,13 +117,10 @@ class ProductManager:
     
     def get_product_categories(self):
         """Get all unique product categories."""
-        products = self.get_all_products()
-        categories = set()
-        
-        for product in products:
-            categories.add(product["category"])
-        
-        return sorted(list(categories))
+        version = self.db.collection_version("products")
+        if not self.db.tracks_versions or self._categories_cache is None or self._categories_cache[0] != version:
+            self._categories_cache = (version, sorted(self.db.distinct("products", "category")))
+        return list(self._categories_cache[1])
     
     def get_low_stock_products(self, threshold=10):
         """
@@ -127,14 +132,24 @@ class ProductManager:
         Returns:
             list: Products with low stock
         """
-        inventory_items = self.db.find("inventory", {"quantity": {"$lte": threshold}})
-        low_stock_products = []
-        
-        for item in inventory_items:
-            product = self.get_product_by_id(item["product_id"])
-            if product:
-                product["stock_quantity"] = item["quantity"]
-                product["reorder_level"] = item["reorder_level"]
-                low_stock_products.append(product)
-        
-        return low_stock_products
\ No newline at end of file
+        versions = (self.db.collection_version("inventory"), self.db.collection_version("products"))
+        cached = self._low_stock_cache.get(threshold)
+        if not self.db.tracks_versions or cached is None or cached[0] != versions:
+            inventory_items = self.db.find("inventory", {"quantity": {"$lte": threshold}})
+            products = self.db.find_many("products", "id", (item["product_id"] for item in inventory_items))
+            
+            # Join in one pass, returning new dicts so the stored products are left untouched;
+            # seeded inventory rows use reorder_point, rows from create_product reorder_level
+            rows = [
+                {
+                    **products[item["product_id"]],
+                    "stock_quantity": item["quantity"],
+                    "reorder_level": item.get("reorder_level", item.get("reorder_point"))
+                }
+                for item in inventory_items
+                if item["product_id"] in products
+            ]
+            cached = (versions, rows)
+            self._low_stock_cache[threshold] = cached
+        
+        return [dict(row) for row in cached[1]]
@@ -5,9 +5,12 @@ A comprehensive tool to check document embeddings in your Pinecone database
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
-from sentence_transformers import SentenceTransformer
+from pinecone import ServerlessSpec
+from pinecone.grpc import PineconeGRPC as Pinecone
+from rag.embedding_model import get_model
 
 # Load environment variables
 load_dotenv()
@@ -20,7 +23,26 @@ class PineconeInspector:
             raise ValueError("❌ PINECONE_API_KEY not found in environment variables")
         
         self.pc = Pinecone(api_key=self.api_key)
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = get_model('all-MiniLM-L6-v2')
+        # One long-lived Index handle (gRPC channel) per index name
+        self._index_cache = {}
+        # index name -> (fetched at, stats), reused for a few seconds
+        self._stats_cache = {}
+    
+    def _get_index(self, index_name):
+        """Get the Index handle for an index, created on first use"""
+        if index_name not in self._index_cache:
+            self._index_cache[index_name] = self.pc.Index(index_name)
+        return self._index_cache[index_name]
+    
+    def _get_stats(self, index_name, ttl=5.0):
+        """Get index statistics, reusing a fetch from the last ttl seconds"""
+        cached = self._stats_cache.get(index_name)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        stats = self._get_index(index_name).describe_index_stats()
+        self._stats_cache[index_name] = (time.monotonic(), stats)
+        return stats
         
     def list_all_indexes(self):
         """List all available Pinecone indexes"""
@@ -49,8 +71,7 @@ class PineconeInspector:
         print("-" * 40)
         
         try:
-            index = self.pc.Index(index_name)
-            stats = index.describe_index_stats()
+            stats = self._get_stats(index_name)
             
             print(f"   • Total vectors: {stats.total_vector_count:,}")
             print(f"   • Dimension: {stats.dimension}")
@@ -71,29 +92,49 @@ class PineconeInspector:
         print("-" * 50)
         
         try:
-            index = self.pc.Index(index_name)
-            stats = index.describe_index_stats()
+            index = self._get_index(index_name)
+            stats = self._get_stats(index_name)
             
             if stats.total_vector_count == 0:
                 print("   📭 No documents found in the index")
                 return []
             
-            # Query with a dummy vector to get some results
-            dummy_vector = [0.0] * stats.dimension
-            results = index.query(
-                vector=dummy_vector,
-                top_k=min(limit, stats.total_vector_count),
-                include_metadata=True
-            )
+            # Listing IDs avoids a nearest-neighbour search just to pick samples;
+            # list_paginated is serverless-only, so pod indexes fall back to a
+            # dummy-vector query
+            try:
+                page = index.list_paginated(limit=min(limit, stats.total_vector_count))
+                ids = [item.id for item in page.vectors]
+            except Exception:
+                ids = None
+            
+            if ids is not None:
+                fetched = index.fetch(ids=ids).vectors if ids else {}
+                samples = [
+                    (doc_id, None, getattr(fetched[doc_id], 'metadata', None))
+                    for doc_id in ids if doc_id in fetched
+                ]
+            else:
+                dummy_vector = [0.0] * stats.dimension
+                results = index.query(
+                    vector=dummy_vector,
+                    top_k=min(limit, stats.total_vector_count),
+                    include_values=False,
+                    include_metadata=True
+                )
+                samples = [
+                    (match.id, match.score, getattr(match, 'metadata', None))
+                    for match in results.matches
+                ]
             
             documents = []
-            for i, match in enumerate(results.matches, 1):
+            for i, (doc_id, score, metadata) in enumerate(samples, 1):
                 print(f"\n   📄 Document {i}:")
-                print(f"      ID: {match.id}")
-                print(f"      Score: {match.score:.4f}")
+                print(f"      ID: {doc_id}")
+                if score is not None:
+                    print(f"      Score: {score:.4f}")
                 
-                if hasattr(match, 'metadata') and match.metadata:
-                    metadata = match.metadata
+                if metadata:
                     print(f"      Metadata:")
                     
                     for key, value in metadata.items():
@@ -105,15 +146,15 @@ class PineconeInspector:
                             print(f"         • {key}: {value}")
                     
                     documents.append({
-                        'id': match.id,
-                        'score': match.score,
+                        'id': doc_id,
+                        'score': score,
                         'metadata': metadata
                     })
                 else:
                     print(f"      No metadata available")
                     documents.append({
-                        'id': match.id,
-                        'score': match.score,
+                        'id': doc_id,
+                        'score': score,
                         'metadata': {}
                     })
             
@@ -129,7 +170,7 @@ class PineconeInspector:
         print("-" * 60)
         
         try:
-            index = self.pc.Index(index_name)
+            index = self._get_index(index_name)
             
             # Create query vector
             query_vector = self.model.encode(query).tolist()
@@ -138,54 +179,97 @@ class PineconeInspector:
             results = index.query(
                 vector=query_vector,
                 top_k=top_k,
+                include_values=False,
                 include_metadata=True
             )
             
-            if not results.matches:
-                print("   📭 No matching documents found")
-                return []
-            
-            search_results = []
-            for i, match in enumerate(results.matches, 1):
-                print(f"\n   🎯 Result {i}:")
-                print(f"      ID: {match.id}")
-                print(f"      Similarity Score: {match.score:.4f}")
-                
-                if hasattr(match, 'metadata') and match.metadata:
-                    metadata = match.metadata
-                    
-                    if 'text' in metadata:
-                        text_preview = str(metadata['text'])[:200] + "..." if len(str(metadata['text'])) > 200 else str(metadata['text'])
-                        print(f"      Text: {text_preview}")
-                    
-                    if 'file_name' in metadata:
-                        print(f"      File: {metadata['file_name']}")
-                    
-                    if 'chunk_index' in metadata:
-                        print(f"      Chunk: {metadata['chunk_index']}")
-                    
-                    if 'topic' in metadata:
-                        print(f"      Topic: {metadata['topic']}")
-                    
-                    search_results.append({
-                        'id': match.id,
-                        'score': match.score,
-                        'metadata': metadata
-                    })
-            
-            return search_results
+            return self._print_search_results(results)
             
         except Exception as e:
             print(f"❌ Error searching documents: {e}")
             return []
     
+    def search_many(self, index_name, queries, top_k=5):
+        """Search for several queries, encoding them together and querying in parallel"""
+        if not queries:
+            return []
+        
+        try:
+            index = self._get_index(index_name)
+            query_vectors = self.model.encode(list(queries), batch_size=len(queries), convert_to_numpy=True)
+        except Exception as e:
+            print(f"❌ Error searching documents: {e}")
+            return [[] for _ in queries]
+        
+        # Each query is a separate round trip, so overlap them; the client is thread-safe
+        with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+            futures = [
+                executor.submit(
+                    index.query,
+                    vector=vector.tolist(),
+                    top_k=top_k,
+                    include_values=False,
+                    include_metadata=True
+                )
+                for vector in query_vectors
+            ]
+        
+        # Report in query order once all responses are in
+        all_results = []
+        for query, future in zip(queries, futures):
+            print(f"\n🔍 Search Results for '{query}' in '{index_name}':")
+            print("-" * 60)
+            try:
+                all_results.append(self._print_search_results(future.result()))
+            except Exception as e:
+                print(f"❌ Error searching documents: {e}")
+                all_results.append([])
+        
+        return all_results
+    
+    def _print_search_results(self, results):
+        """Print the matches of a query response and return them as dicts"""
+        if not results.matches:
+            print("   📭 No matching documents found")
+            return []
+        
+        search_results = []
+        for i, match in enumerate(results.matches, 1):
+            print(f"\n   🎯 Result {i}:")
+            print(f"      ID: {match.id}")
+            print(f"      Similarity Score: {match.score:.4f}")
+            
+            if hasattr(match, 'metadata') and match.metadata:
+                metadata = match.metadata
+                
+                if 'text' in metadata:
+                    text_preview = str(metadata['text'])[:200] + "..." if len(str(metadata['text'])) > 200 else str(metadata['text'])
+                    print(f"      Text: {text_preview}")
+                
+                if 'file_name' in metadata:
+                    print(f"      File: {metadata['file_name']}")
+                
+                if 'chunk_index' in metadata:
+                    print(f"      Chunk: {metadata['chunk_index']}")
+                
+                if 'topic' in metadata:
+                    print(f"      Topic: {metadata['topic']}")
+                
+                search_results.append({
+                    'id': match.id,
+                    'score': match.score,
+                    'metadata': metadata
+                })
+        
+        return search_results
+    
     def inspect_specific_document(self, index_name, doc_id):
         """Retrieve and inspect a specific document by ID"""
         print(f"\n🔍 Inspecting Document '{doc_id}' in '{index_name}':")
         print("-" * 50)
         
         try:
-            index = self.pc.Index(index_name)
+            index = self._get_index(index_name)
             
             # Fetch the specific document
             result = index.fetch(ids=[doc_id])
@@ -247,8 +331,7 @@ class PineconeInspector:
                 "logistics optimization"
             ]
             
-            for query in search_queries:
-                self.search_documents(index_name, query, top_k=2)
+            self.search_many(index_name, search_queries, top_k=2)
         
         print("\n" + "=" * 60)
         print("✅ Comprehensive inspection complete!")
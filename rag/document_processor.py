@@ -1,10 +1,13 @@
+import hashlib
 import os
+import sqlite3
+import threading
 import uuid
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-import torch
 
+from rag.embedding_model import get_model
 from rag.rag_handler import RAGHandler
 
 class DocumentProcessor:
@@ -19,14 +22,17 @@ class DocumentProcessor:
         Args:
             embedding_model (str): Name of the sentence transformer model to use
         """
-        # Prefer CPU to avoid PyTorch meta device issues
-        device = 'cuda' if hasattr(torch, 'cuda') and torch.cuda.is_available() else 'cpu'
-        try:
-            self.model = SentenceTransformer(embedding_model, device=device)
-        except NotImplementedError as e:
-            # Fallback to CPU in case of meta tensor/device errors
-            print(f"SentenceTransformer init error ({e}); falling back to CPU.")
-            self.model = SentenceTransformer(embedding_model, device='cpu')
+        # Shared with the other RAG components (loaded once per process)
+        self.model = get_model(embedding_model)
+        self.embedding_model = embedding_model
+        # On-disk embedding cache keyed by (model, chunk hash), opened lazily
+        self.embedding_cache_path = os.environ.get("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embeddings.db"))
+        self._cache_conn = None
+        self._cache_lock = threading.Lock()
+        # Opt-in near-duplicate reuse: a miss whose SimHash is within this many
+        # bits of a recently cached chunk reuses that chunk's vector. Off (0) by
+        # default, since short chunks collide loosely; around 3 is a cautious start
+        self.simhash_max_distance = int(os.environ.get("EMBEDDING_SIMHASH_DISTANCE", "0"))
         self.supported_extensions = ['.txt', '.csv', '.pdf', '.docx', '.xlsx']
         # Safety limits to avoid memory issues
         self.max_text_chars = int(os.environ.get("MAX_TEXT_CHARS", "1000000"))  # 1M chars
@@ -62,18 +68,18 @@ class DocumentProcessor:
         if ext == '.txt':
             try:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text = f.read()
-                    # Cap text to avoid huge memory usage
-                    return text[:self.max_text_chars]
+                    # Read only up to the cap so large files are never fully loaded
+                    return f.read(self.max_text_chars)
             except Exception as e:
                 print(f"Error reading text file: {e}")
                 return ""
         
         elif ext == '.csv':
             try:
-                # Limit rows to avoid huge string generation
-                df = pd.read_csv(file_path)
-                text = df.head(1000).to_string()
+                # Parse only the rows we keep, as strings (no type inference),
+                # and serialize as CSV rather than the padded to_string layout
+                df = pd.read_csv(file_path, nrows=1000, dtype=str, engine='c')
+                text = df.to_csv(index=False)
                 return text[:self.max_text_chars]
             except Exception as e:
                 print(f"Error reading CSV file: {e}")
@@ -114,8 +120,7 @@ class DocumentProcessor:
         chunks = []
         start = 0
         
-        count = 0
-        while start < len(text) and count < self.max_chunks:
+        while start < len(text) and len(chunks) < self.max_chunks:
             end = min(start + chunk_size, len(text))
             
             # Try to find a good breaking point (newline or space)
@@ -130,34 +135,268 @@ class DocumentProcessor:
                     if space_pos > start:
                         end = space_pos + 1
             
-            # Guard against no progress
-            if end <= start:
-                break
             chunks.append(text[start:end])
-            start = end - overlap
-            count += 1
+            # The last chunk reaches the end of the text; stepping back by the
+            # overlap from here would only repeat it
+            if end >= len(text):
+                break
+            # Step back by the overlap, but always make progress
+            start = end - overlap if end - overlap > start else end
         
         return chunks
     
-    def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+    def _get_cache(self) -> Optional[sqlite3.Connection]:
         """
-        Embed text chunks.
+        Open the embedding cache database on first use.
+        
+        Returns:
+            sqlite3.Connection: Cache connection, or None if the cache is unavailable
+        """
+        if self._cache_conn is None:
+            try:
+                cache_dir = os.path.dirname(self.embedding_cache_path)
+                if cache_dir:
+                    os.makedirs(cache_dir, exist_ok=True)
+                conn = sqlite3.connect(self.embedding_cache_path, check_same_thread=False)
+                # WAL lets concurrent readers proceed while a writer appends
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings_int8 ("
+                    "model TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL, "
+                    "PRIMARY KEY (model, key))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS simhashes ("
+                    "model TEXT NOT NULL, simhash INTEGER NOT NULL, key TEXT NOT NULL)"
+                )
+                conn.commit()
+                self._cache_conn = conn
+            except (sqlite3.Error, OSError) as e:
+                print(f"Embedding cache unavailable: {e}")
+                return None
+        return self._cache_conn
+    
+    @staticmethod
+    def _simhash(text: str) -> Optional[int]:
+        """
+        Compute a 64-bit SimHash over word trigrams.
         
         Args:
-            chunks (List[str]): List of text chunks
+            text (str): Chunk text
             
         Returns:
-            List[List[float]]: List of embeddings
+            int: Signed 64-bit fingerprint (SQLite INTEGER range), or None if the
+            text is too short for the fingerprint to be meaningful
         """
-        if not chunks:
-            return []
+        words = text.lower().split()
+        if len(words) < 20:
+            return None
+        shingles = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles],
+            dtype=np.uint64
+        )
+        # Each bit of the fingerprint is a majority vote over the shingle hashes
+        bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(hashes)
+        fingerprint = np.packbits(votes > 0, bitorder='little').view(np.int64)[0]
+        return int(fingerprint)
+    
+    @staticmethod
+    def _pack_vector(vec: np.ndarray) -> bytes:
+        """
+        Quantize a vector to int8 with a per-vector scale for storage.
+        
+        Args:
+            vec (np.ndarray): float32 embedding
+            
+        Returns:
+            bytes: float32 scale followed by one int8 per dimension
+        """
+        peak = float(np.max(np.abs(vec))) if vec.size else 0.0
+        scale = np.float32(peak / 127 if peak > 0 else 1.0)
+        quantized = np.round(vec / scale).astype(np.int8)
+        return scale.tobytes() + quantized.tobytes()
+    
+    @staticmethod
+    def _unpack_vector(blob: bytes) -> np.ndarray:
+        """
+        Restore a stored vector as a unit-length float32 array.
+        
+        Args:
+            blob (bytes): Stored vector, as written by _pack_vector
+            
+        Returns:
+            np.ndarray: float32 embedding
+        """
+        scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+        vec = np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+        # Renormalize away the rounding error so vectors stay unit length
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+    
+    def _read_cached(self, conn: sqlite3.Connection, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Read cached vectors for the given keys.
+        
+        Args:
+            conn (sqlite3.Connection): Cache connection
+            keys (List[str]): Content hashes to look up
+            
+        Returns:
+            Dict[str, np.ndarray]: Vectors by key, for the keys that are cached
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(unique_keys), 500):
+            batch = unique_keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, vec FROM embeddings_int8 WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                [self.embedding_model, *batch]
+            )
+            for key, vec in rows:
+                found[key] = self._unpack_vector(vec)
+        return found
+    
+    def _match_near_duplicates(self, conn: sqlite3.Connection, fingerprints: Dict[str, int]) -> Dict[str, str]:
+        """
+        Match chunk fingerprints against recently cached chunks.
         
+        Args:
+            conn (sqlite3.Connection): Cache connection
+            fingerprints (Dict[str, int]): SimHash by chunk key
+            
+        Returns:
+            Dict[str, str]: Key of the closest cached chunk, for chunks within
+            simhash_max_distance bits of one
+        """
+        if not fingerprints:
+            return {}
+        
+        rows = conn.execute(
+            "SELECT simhash, key FROM simhashes WHERE model = ? ORDER BY rowid DESC LIMIT 4096",
+            (self.embedding_model,)
+        ).fetchall()
+        if not rows:
+            return {}
+        
+        recent = np.array([row[0] for row in rows], dtype=np.int64)
+        matches = {}
+        for key, fingerprint in fingerprints.items():
+            diff = np.bitwise_xor(recent, np.int64(fingerprint))
+            distances = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] <= self.simhash_max_distance:
+                matches[key] = rows[best][1]
+        return matches
+    
+    def _encode(self, chunks: List[str]) -> np.ndarray:
+        """
+        Encode chunks with the sentence transformer as a float32 matrix.
+        
+        Args:
+            chunks (List[str]): List of text chunks
+            
+        Returns:
+            np.ndarray: Unit-length embeddings, one row per chunk
+        """
+        # Encode in length order so each batch pads to similar-sized chunks,
+        # then scatter the rows back to the caller's order
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+        ordered = [chunks[i] for i in order]
         # Use batched encoding to reduce memory spikes
         try:
-            return self.model.encode(chunks, batch_size=32).tolist()
+            embeddings = self.model.encode(ordered, batch_size=64, convert_to_numpy=True)
         except Exception:
             # Fallback to per-chunk encoding
-            return [self.model.encode(chunk).tolist() for chunk in chunks]
+            embeddings = [self.model.encode(chunk) for chunk in ordered]
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        # Normalize so cosine similarity downstream is a plain dot product
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+        out = np.empty_like(embeddings)
+        out[order] = embeddings
+        return out
+    
+    def embed_chunks(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed text chunks.
+        
+        Embeddings are cached on disk by model and chunk content, so only chunks
+        that have not been seen before are encoded. With EMBEDDING_SIMHASH_DISTANCE
+        set, a new chunk that is a near duplicate of a cached one (by SimHash)
+        reuses the cached vector.
+        
+        Args:
+            chunks (List[str]): List of text chunks
+            
+        Returns:
+            np.ndarray: float32 unit-length embeddings, one row per chunk
+        """
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        keys = [hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).hexdigest() for chunk in chunks]
+        
+        with self._cache_lock:
+            conn = self._get_cache()
+            cached = {}
+            if conn is not None:
+                try:
+                    cached = self._read_cached(conn, keys)
+                except sqlite3.Error as e:
+                    print(f"Error reading embedding cache: {e}")
+            
+            # Encode each missing chunk once, even if it repeats
+            misses = {}
+            for key, chunk in zip(keys, chunks):
+                if key not in cached and key not in misses:
+                    misses[key] = chunk
+            
+            fingerprints = {}
+            reused_keys = []
+            if misses and conn is not None and self.simhash_max_distance > 0:
+                for key, chunk in misses.items():
+                    fingerprint = self._simhash(chunk)
+                    if fingerprint is not None:
+                        fingerprints[key] = fingerprint
+                try:
+                    near = self._match_near_duplicates(conn, fingerprints)
+                    if near:
+                        reused = self._read_cached(conn, list(near.values()))
+                        for key, match_key in near.items():
+                            if match_key in reused:
+                                cached[key] = reused[match_key]
+                                reused_keys.append(key)
+                                del misses[key]
+                except sqlite3.Error as e:
+                    print(f"Error reading embedding cache: {e}")
+            
+            if misses:
+                encoded = self._encode(list(misses.values()))
+                for key, vec in zip(misses, encoded):
+                    cached[key] = vec
+            
+            # Reused vectors are stored under their own key too, so the next
+            # ingest of the same text is an exact hit
+            if (misses or reused_keys) and conn is not None:
+                try:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO embeddings_int8 (model, key, vec) VALUES (?, ?, ?)",
+                        [(self.embedding_model, key, self._pack_vector(cached[key])) for key in [*misses, *reused_keys]]
+                    )
+                    conn.executemany(
+                        "INSERT INTO simhashes (model, simhash, key) VALUES (?, ?, ?)",
+                        [(self.embedding_model, fingerprints[key], key) for key in misses if key in fingerprints]
+                    )
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing embedding cache: {e}")
+        
+        return np.stack([cached[key] for key in keys])
     
     def process_document(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
@@ -194,10 +433,12 @@ class DocumentProcessor:
             "file_type": os.path.splitext(file_path)[1].lower()
         })
         
-        # Create document chunks
+        # Create document chunks; random bytes for all chunk IDs come from a
+        # single urandom call instead of one per uuid4()
+        raw_ids = os.urandom(16 * len(chunks))
         document_chunks = []
         for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_id = str(uuid.uuid4())
+            chunk_id = str(uuid.UUID(bytes=raw_ids[16 * i:16 * (i + 1)], version=4))
             document_chunks.append({
                 "id": chunk_id,
                 "text": chunk,
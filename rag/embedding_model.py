@@ -0,0 +1,192 @@
+import functools
+import os
+import threading
+from typing import List, Optional, Union
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+import torch
+
+# Serializes first loads so concurrent callers share one model instead of each loading it
+_load_lock = threading.Lock()
+
+def _intra_op_threads() -> int:
+    """Intra-op thread count: TORCH_NUM_THREADS if set to a number, else min(16, cores)."""
+    default = min(16, os.cpu_count() or 1)
+    value = os.environ.get("TORCH_NUM_THREADS")
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"Ignoring invalid TORCH_NUM_THREADS={value!r}; using {default} threads.")
+        return default
+
+# PyTorch's CPU defaults either underuse the cores or oversubscribe them next to
+# the app's own thread pools; cap intra-op threads (TORCH_NUM_THREADS overrides
+# the cap, e.g. on hosts shared with other services) and keep inter-op small
+torch.set_num_threads(_intra_op_threads())
+try:
+    torch.set_num_interop_threads(2)
+except RuntimeError:
+    # Can only be set before any inter-op work has started in this process
+    pass
+
+def default_device() -> str:
+    """
+    Get the device embedding models run on.
+
+    Returns:
+        str: 'cuda' if a GPU is available, otherwise 'cpu'
+    """
+    return 'cuda' if hasattr(torch, 'cuda') and torch.cuda.is_available() else 'cpu'
+
+class OnnxEmbeddingModel:
+    """
+    Sentence embedding model served by ONNX Runtime on CPU.
+    
+    Implements the subset of the SentenceTransformer encode interface the RAG
+    components use: mean pooling over token embeddings, then L2 normalization.
+    """
+    
+    def __init__(self, name: str, max_seq_length: int = 256, quantize: bool = False):
+        """
+        Export the model to ONNX and open an optimized inference session.
+        
+        The exported (and optionally quantized) model is saved under
+        ONNX_CACHE_DIR (default .cache/onnx) so later processes skip the export.
+        
+        Args:
+            name (str): Name of the sentence transformer model
+            max_seq_length (int): Token limit per text, as in the PyTorch model
+            quantize (bool): Apply dynamic INT8 quantization to the exported model
+        """
+        # Optional dependencies, only needed when ORT_ENABLE=1
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        repo_id = name if '/' in name else f"sentence-transformers/{name}"
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        
+        model_dir = os.path.join(
+            os.environ.get("ONNX_CACHE_DIR", os.path.join(".cache", "onnx")),
+            repo_id.replace('/', '--')
+        )
+        file_name = "model_quantized.onnx" if quantize else "model.onnx"
+        
+        if not os.path.exists(os.path.join(model_dir, "model.onnx")):
+            exported = ORTModelForFeatureExtraction.from_pretrained(repo_id, export=True)
+            exported.save_pretrained(model_dir)
+        if quantize and not os.path.exists(os.path.join(model_dir, file_name)):
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            
+            # Dynamic quantization: INT8 weights, activations quantized per batch
+            quantizer = ORTQuantizer.from_pretrained(model_dir, file_name="model.onnx")
+            quantizer.quantize(
+                save_dir=model_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        self.session = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=file_name, session_options=options
+        )
+        self.max_seq_length = max_seq_length
+    
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """
+        Embed one text or a list of texts.
+        
+        Args:
+            sentences (Union[str, List[str]]): Text or texts to embed
+            batch_size (int): Number of texts per inference call
+            
+        Returns:
+            np.ndarray: Embedding vector for a single text, else one row per text
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        
+        pooled = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            token_embeddings = np.asarray(self.session(**inputs).last_hidden_state, dtype=np.float32)
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            pooled.append((token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        if not pooled:
+            return np.zeros((0, self.session.config.hidden_size), dtype=np.float32)
+        embeddings = np.concatenate(pooled)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+class AutocastEmbeddingModel:
+    """
+    SentenceTransformer wrapper that encodes under reduced-precision autocast.
+    
+    bfloat16 on CPU, float16 on GPU; every other attribute is the wrapped model's.
+    """
+    
+    def __init__(self, model: SentenceTransformer, device: str):
+        self.model = model
+        self.device_type = 'cuda' if device.startswith('cuda') else 'cpu'
+        self.dtype = torch.float16 if self.device_type == 'cuda' else torch.bfloat16
+    
+    def encode(self, *args, **kwargs):
+        with torch.inference_mode(), torch.autocast(device_type=self.device_type, dtype=self.dtype):
+            embeddings = self.model.encode(*args, **kwargs)
+        # Hand back float32 like the unwrapped model
+        return embeddings.astype(np.float32) if isinstance(embeddings, np.ndarray) else embeddings
+    
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+@functools.lru_cache(maxsize=4)
+def _load_model(name: str, device: str):
+    # ONNX Runtime is a CPU fast path, opted into with ORT_ENABLE=1 (plus
+    # ORT_QUANTIZE=1 for the INT8 model)
+    if device == 'cpu' and os.environ.get("ORT_ENABLE") == "1":
+        try:
+            return OnnxEmbeddingModel(name, quantize=os.environ.get("ORT_QUANTIZE") == "1")
+        except Exception as e:
+            print(f"ONNX Runtime model unavailable ({e}); using SentenceTransformer.")
+    try:
+        model = SentenceTransformer(name, device=device)
+    except NotImplementedError as e:
+        # Fallback to CPU in case of meta tensor/device errors
+        print(f"SentenceTransformer init error ({e}); falling back to CPU.")
+        device = 'cpu'
+        model = SentenceTransformer(name, device=device)
+    # Reduced precision is opt-in: it only pays off on CPUs with native bf16
+    # (AVX-512 BF16 / AMX) or on GPUs, and shifts embeddings slightly
+    if os.environ.get("EMBEDDING_AUTOCAST") == "1":
+        return AutocastEmbeddingModel(model, device)
+    return model
+
+def get_model(name: str = 'all-MiniLM-L6-v2', device: Optional[str] = None):
+    """
+    Get the process-wide sentence transformer for a model name and device.
+
+    The model is loaded on first use and shared by every caller afterwards, so
+    callers must not modify it (e.g. change its device or max_seq_length).
+
+    Args:
+        name (str): Name of the sentence transformer model
+        device (str, optional): Device to run on; defaults to default_device()
+
+    Returns:
+        SentenceTransformer: Shared model instance (an OnnxEmbeddingModel when
+        ORT_ENABLE=1 on CPU, an AutocastEmbeddingModel when EMBEDDING_AUTOCAST=1)
+    """
+    with _load_lock:
+        return _load_model(name, device or default_device())
@@ -1,10 +1,11 @@
+import asyncio
+import functools
+import os
 from typing import List, Dict, Any, Optional
+import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import torch
-from rag.rag_handler import RAGHandler
-
-import os
+from rag.embedding_model import get_model
+from rag.rag_handler import RAGHandler, text_from_metadata
 
 class QueryEngine:
     """
@@ -22,14 +23,18 @@ class QueryEngine:
         #self.rag_handler = rag_handler or RAGHandler(mock=False)  # Use actual Pinecone instead of mock
         self.rag_handler = rag_handler or RAGHandler(mock=False,api_key=os.environ.get("PINECONE_API_KEY"))
 
-        # Prefer CPU to avoid PyTorch meta device issues
-        device = 'cuda' if hasattr(torch, 'cuda') and torch.cuda.is_available() else 'cpu'
-        try:
-            self.model = SentenceTransformer(embedding_model, device=device)
-        except NotImplementedError as e:
-            # Fallback to CPU in case of meta tensor/device errors
-            print(f"SentenceTransformer init error ({e}); falling back to CPU.")
-            self.model = SentenceTransformer(embedding_model, device='cpu')
+        # Shared with the other RAG components (loaded once per process)
+        self.model = get_model(embedding_model)
+        # Per-instance LRU of query -> embedding; repeated queries skip the encoder
+        self._encode_query = functools.lru_cache(maxsize=1024)(self._encode_query_uncached)
+        
+        # FAISS index over a local replica of the Pinecone index (LOCAL_INDEX=1)
+        # so queries skip the network round trip; in mock mode the handler
+        # searches its own FAISS index
+        self._faiss_index = None
+        self._faiss_version = None
+        if os.environ.get("LOCAL_INDEX") == "1" and not self.rag_handler.mock:
+            self.rag_handler.load_local_replica()
     
     def process_query(self, query: str, top_k: int = 5) -> Dict[str, Any]:
         """
@@ -52,6 +57,35 @@ class QueryEngine:
             # Fall back to RAG handler's answer if no documents found
             return self.rag_handler.get_answer(query)
             
+    async def process_query_async(self, query: str, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Process a query without blocking the event loop.
+        
+        Encoding and the Pinecone round trip run in a worker thread, so an async
+        caller can keep serving other requests while they are in flight.
+        
+        Args:
+            query (str): User query
+            top_k (int): Number of results to return
+            
+        Returns:
+            Dict[str, Any]: Query results with answer and sources
+        """
+        return await asyncio.to_thread(self.process_query, query, top_k)
+    
+    async def process_queries_async(self, queries: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Process several queries concurrently.
+        
+        Args:
+            queries (List[str]): User queries
+            top_k (int): Number of results to return per query
+            
+        Returns:
+            List[Dict[str, Any]]: Query results, in the order of the queries
+        """
+        return list(await asyncio.gather(*(self.process_query_async(query, top_k) for query in queries)))
+    
     def _generate_response_from_docs(self, query: str, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Generate a response based on retrieved documents.
@@ -69,7 +103,7 @@ class QueryEngine:
             if "metadata" in doc:
                 metadata = doc["metadata"]
                 if isinstance(metadata, dict) and "text" in metadata:
-                    contexts.append(metadata["text"])
+                    contexts.append(text_from_metadata(metadata))
         
         # Extract source information
         sources = []
@@ -101,7 +135,72 @@ class QueryEngine:
         Returns:
             List[Dict[str, Any]]: Relevant documents
         """
-        return self.rag_handler.search(query, top_k=top_k)
+        # Whitespace-only variants of a query share one cache entry
+        query_embedding = self._encode_query(" ".join(query.split()))
+        
+        docs = None if self.rag_handler.mock else self.rag_handler.local_vectors
+        if docs is not None:
+            index = self._get_local_index(docs)
+            if index is not None:
+                query_vector = np.array([query_embedding], dtype=np.float32)
+                faiss.normalize_L2(query_vector)
+                scores, positions = index.search(query_vector, min(top_k, index.ntotal))
+                return [
+                    {
+                        "id": docs[position]["id"],
+                        "score": float(score),
+                        "metadata": docs[position]["metadata"]
+                    }
+                    for score, position in zip(scores[0], positions[0])
+                    if position >= 0
+                ]
+        
+        return self.rag_handler.search(query, top_k=top_k, query_vector=query_embedding)
+    
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        """
+        Embed a query (wrapped in an LRU cache as _encode_query).
+        
+        Args:
+            query (str): Search query
+            
+        Returns:
+            np.ndarray: Unit-length float32 embedding, read-only so the cached
+            array cannot be modified by a caller
+        """
+        vector = np.asarray(
+            self.model.encode(query, convert_to_numpy=True, normalize_embeddings=True),
+            dtype=np.float32
+        )
+        vector.flags.writeable = False
+        return vector
+    
+    def _get_local_index(self, docs: List[Dict[str, Any]]) -> Optional[faiss.Index]:
+        """
+        Get a FAISS inner-product index over the RAG handler's in-memory vectors.
+        
+        Vectors are L2-normalized so inner product equals cosine similarity. The
+        index is rebuilt only when the handler's local_vectors_version changes.
+        
+        Args:
+            docs (List[Dict[str, Any]]): rag_handler.local_vectors
+            
+        Returns:
+            Optional[faiss.Index]: Index aligned with docs, or None if empty
+        """
+        if not docs:
+            return None
+        
+        version = self.rag_handler.local_vectors_version
+        if self._faiss_index is None or version != self._faiss_version:
+            vectors = np.asarray([doc["vector"] for doc in docs], dtype=np.float32)
+            faiss.normalize_L2(vectors)
+            index = faiss.IndexFlatIP(vectors.shape[1])
+            index.add(vectors)
+            self._faiss_index = index
+            self._faiss_version = version
+        
+        return self._faiss_index
     
     def generate_response(self, query: str, context: List[str]) -> str:
         """
@@ -123,8 +222,8 @@ class QueryEngine:
         # Combine the context information to form a response
         response = f"Based on the uploaded documents, here's information about '{query}':\n\n"
         
-        # Add unique contexts to the response (avoid duplicates)
-        unique_contexts = list(set(context))
+        # Add unique contexts to the response (avoid duplicates), keeping relevance order
+        unique_contexts = list(dict.fromkeys(context))
         for i, ctx in enumerate(unique_contexts[:3]):
             # Limit context length for readability
             ctx_preview = ctx[:300] + "..." if len(ctx) > 300 else ctx
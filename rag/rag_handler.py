@@ -1,19 +1,225 @@
+import base64
+import copy
+import hashlib
 import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
-from pinecone import Pinecone
-from sentence_transformers import SentenceTransformer
+import faiss
+from pinecone.grpc import PineconeGRPC as Pinecone
 import numpy as np
+import pandas as pd
 import json
 import uuid
 
+from rag.embedding_model import get_model
+
 # Load environment variables
 load_dotenv()
 
+# Placeholder query vector for indexes that cannot list their IDs
+_ZERO_VEC = [0.0] * 384  # Match the embedding dimension
+
+# Pinecone fetch calls kept in flight while listing documents
+FETCH_WINDOW = 8
+
+# Characters of chunk text stored verbatim in metadata["text"]; the rest is
+# stored zlib-compressed in metadata["text_rest_gz"]
+TEXT_PREVIEW_CHARS = 400
+
+def pack_text_metadata(metadata, text):
+    """
+    Store chunk text in metadata as a plain preview plus a compressed remainder.
+    
+    Previews (everything that displays metadata["text"]) read the first
+    TEXT_PREVIEW_CHARS characters as before; the rest is sent compressed on
+    every query response.
+    
+    Args:
+        metadata (dict): Metadata to update in place
+        text (str): Full chunk text
+        
+    Returns:
+        dict: The updated metadata
+    """
+    metadata["text"] = text[:TEXT_PREVIEW_CHARS]
+    metadata.pop("text_rest_gz", None)
+    if len(text) > TEXT_PREVIEW_CHARS:
+        rest = zlib.compress(text[TEXT_PREVIEW_CHARS:].encode("utf-8"), 9)
+        metadata["text_rest_gz"] = base64.b64encode(rest).decode("ascii")
+    return metadata
+
+def text_from_metadata(metadata):
+    """
+    Get the full chunk text from metadata written by pack_text_metadata.
+    
+    Args:
+        metadata (dict): Vector metadata
+        
+    Returns:
+        str: Full chunk text (empty if the metadata has none)
+    """
+    text = metadata.get("text") or ""
+    rest = metadata.get("text_rest_gz")
+    if rest:
+        text += zlib.decompress(base64.b64decode(rest)).decode("utf-8")
+    return text
+
+# Mock answer topics in priority order: (query keywords, result text keywords,
+# answer used when no retrieved text mentions the topic)
+MOCK_ANSWER_KEYWORDS = (
+    (("abc analysis",), ("abc analysis",),
+     "ABC Analysis is an inventory categorization method which consists of dividing items into three categories: A, B, and C based on their value and sales frequency."),
+    (("jit", "just in time"), ("jit", "just-in-time"),
+     "Just-in-Time (JIT) inventory management is a strategy that aligns raw-material orders from suppliers directly with production schedules to reduce waste and inventory costs."),
+    (("eoq", "economic order quantity"), ("eoq", "economic order quantity"),
+     "Economic Order Quantity (EOQ) is the order quantity that minimizes the total holding costs and ordering costs."),
+    (("fifo", "first in first out"), ("fifo", "first-in, first-out"),
+     "First-In, First-Out (FIFO) is an asset-management method in which assets produced or acquired first are sold, used, or disposed of first."),
+    (("safety stock",), ("safety stock",),
+     "Safety stock is a level of extra stock that is maintained to mitigate risk of stockouts caused by uncertainties in supply and demand."),
+)
+
+# One pass over the query finds every topic keyword; the lookahead also
+# reports keywords that overlap another match
+_QUERY_KEYWORD_TOPIC = {
+    keyword: topic
+    for topic, (query_keywords, _, _) in enumerate(MOCK_ANSWER_KEYWORDS)
+    for keyword in query_keywords
+}
+_QUERY_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _QUERY_KEYWORD_TOPIC) + "))"
+)
+# Case-insensitive, so result texts are not lowercased per query
+_TEXT_KEYWORD_RES = tuple(
+    re.compile("|".join(re.escape(keyword) for keyword in text_keywords), re.IGNORECASE)
+    for _, text_keywords, _ in MOCK_ANSWER_KEYWORDS
+)
+
+def _as_dict(match):
+    """Convert a query match, whether a client object or a dict, to an id/score/metadata dict."""
+    if isinstance(match, dict):
+        return {
+            "id": match.get('id', ''),
+            "score": match.get('score', 0),
+            "metadata": match.get('metadata', {})
+        }
+    return {
+        "id": match.id,
+        "score": getattr(match, 'score', 0),
+        "metadata": getattr(match, 'metadata', {})
+    }
+
+class SemanticAnswerCache:
+    """
+    Cache of answers keyed by query embedding.
+    
+    A query whose embedding has cosine similarity of at least `threshold` with a
+    cached query, answered less than `ttl` seconds ago, gets that answer back.
+    Least recently used entries are evicted past `max_entries`.
+    """
+    
+    def __init__(self, dimension=384, threshold=0.95, ttl=300.0, max_entries=1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        # cache id -> (stored at, answer), least recently used first
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalized(vector):
+        query = np.array([vector], dtype=np.float32)
+        faiss.normalize_L2(query)
+        return query
+    
+    def get(self, query_vector):
+        """
+        Look up the answer to a similar query.
+        
+        Args:
+            query_vector (list or np.ndarray): Query embedding
+            
+        Returns:
+            dict: Copy of the cached answer, or None on a miss
+        """
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(self._normalized(query_vector), 1)
+            entry_id = int(ids[0, 0])
+            if entry_id < 0 or scores[0, 0] < self.threshold:
+                return None
+            stored_at, answer = self._entries[entry_id]
+            if time.monotonic() - stored_at >= self.ttl:
+                self._remove([entry_id])
+                return None
+            self._entries.move_to_end(entry_id)
+            # Callers may modify their answer (e.g. its sources); keep the entry intact
+            return copy.deepcopy(answer)
+    
+    def put(self, query_vector, answer):
+        """
+        Cache the answer to a query.
+        
+        Args:
+            query_vector (list or np.ndarray): Query embedding
+            answer (dict): Answer to return for similar queries
+        """
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(self._normalized(query_vector), np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (time.monotonic(), copy.deepcopy(answer))
+            if len(self._entries) > self.max_entries:
+                self._remove(list(self._entries)[:len(self._entries) - self.max_entries])
+    
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._index.reset()
+            self._entries.clear()
+    
+    def _remove(self, entry_ids):
+        self._index.remove_ids(np.asarray(entry_ids, dtype=np.int64))
+        for entry_id in entry_ids:
+            del self._entries[entry_id]
+
 class RAGHandler:
-    def __init__(self, mock=False, api_key=None, embedding_model='all-MiniLM-L6-v2'):
-        # Initialize the embedding model
-        self.model = SentenceTransformer(embedding_model)
+    def __init__(self, mock=False, api_key=None, embedding_model='all-MiniLM-L6-v2', quantize=False):
+        # The embedding model (shared with the other RAG components) is loaded
+        # on first use, so handlers that only list or delete never load it
+        self.embedding_model_name = embedding_model
+        self._model = None
         self.mock = mock
+        # Store mock vectors as 8-bit codes (4x smaller) instead of exact float32
+        self.quantize = quantize
+        # LRU of text digest -> embedding for embed_text
+        self.embedding_cache_size = 4096
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        # Answers to recent queries, reused for near-identical questions
+        self.answer_cache = SemanticAnswerCache()
+        # FAISS inner-product index over the normalized mock vectors, built on
+        # first search and then kept in step with adds and deletes
+        self._mock_index = None
+        self._mock_index_docs = {}
+        self._next_mock_index_id = 0
+        # In-process copy of the Pinecone vectors, filled by load_local_replica
+        self.local_vectors = None
+        # (total_vector_count, documents) from the last get_all_documents, reused
+        # while the count is unchanged and no write went through this handler
+        self._documents_cache = None
+        # Bumped on every change to local_vectors, so readers can cache derived indexes
+        self.local_vectors_version = 0
+        # Content hash -> ID of texts stored by add_document, so re-adding the
+        # same text skips the encoder and the upsert
+        self._content_ids = {}
         
         # Initialize mock vectors if in mock mode
         if self.mock:
@@ -52,10 +258,8 @@ class RAGHandler:
                             region="us-east-1"
                         )
                     )
-                    # Wait for index to be ready
-                    import time
                     print("Waiting for index to be ready...")
-                    time.sleep(10)
+                    self._wait_until_ready(index_name)
                     
                 self.index = self.pc.Index(index_name)
                 print(f"Connected to Pinecone index: {index_name}")
@@ -67,6 +271,34 @@ class RAGHandler:
                 self._initialize_mock_data()
 
     
+    def _wait_until_ready(self, index_name, timeout=30.0):
+        """
+        Poll a newly created index until Pinecone reports it ready.
+        
+        Args:
+            index_name (str): Name of the index
+            timeout (float, optional): Seconds to wait before giving up
+            
+        Returns:
+            bool: True if the index became ready within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while True:
+            if self.pc.describe_index(index_name).status['ready']:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+    
+    @property
+    def model(self):
+        """Sentence transformer used for embeddings, loaded on first access."""
+        if self._model is None:
+            self._model = get_model(self.embedding_model_name)
+        return self._model
+    
     def _initialize_mock_data(self):
         """Initialize mock data for RAG."""
         mock_documents = [
@@ -122,33 +354,122 @@ class RAGHandler:
             }
         ]
         
-        for doc in mock_documents:
-            vector = self.model.encode(doc["text"]).tolist()
-            self.mock_vectors.append({
-                "id": doc["id"],
-                "vector": vector,
-                "metadata": {
-                    "text": doc["text"],
-                    **doc["metadata"]
-                }
-            })
+        # One batched encode for all documents instead of one forward pass each
+        self.add_documents(mock_documents)
     
     def embed_text(self, text):
         """
         Embed text using the sentence transformer model.
         
+        Recent texts are served from an LRU cache, so repeated queries skip the
+        encoder.
+        
         Args:
             text (str): Text to embed
             
         Returns:
-            list: Embedding vector
+            np.ndarray: Read-only float32 embedding vector
+        """
+        # Key on a digest so long texts don't stay alive in the cache
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._embedding_cache_lock:
+            vector = self._embedding_cache.get(key)
+            if vector is not None:
+                self._embedding_cache.move_to_end(key)
+        
+        if vector is None:
+            vector = np.asarray(self.model.encode(text, convert_to_numpy=True), dtype=np.float32)
+            # The cached array is handed to every caller, so it must not change
+            vector.setflags(write=False)
+            with self._embedding_cache_lock:
+                self._embedding_cache[key] = vector
+                if len(self._embedding_cache) > self.embedding_cache_size:
+                    self._embedding_cache.popitem(last=False)
+        
+        return vector
+    
+    def embed_texts(self, texts):
+        """
+        Embed several texts in length-sorted batches.
+        
+        Sorting by length lets each batch pad only to similar-length texts; rows
+        are returned in the order of the input.
+        
+        Args:
+            texts (list): Texts to embed
+            
+        Returns:
+            np.ndarray: Unit-length float32 embeddings, one row per text
         """
-        return self.model.encode(text).tolist()
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        encoded = self.model.encode(
+            [texts[i] for i in order],
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        embeddings = np.empty_like(np.asarray(encoded, dtype=np.float32))
+        embeddings[order] = encoded
+        return embeddings
+    
+    def load_local_replica(self):
+        """
+        Copy every vector in the Pinecone index into local_vectors.
+        
+        Documents added or deleted through this handler afterwards are applied
+        to the copy as well; changes made by other processes are not.
+        
+        Returns:
+            bool: True if the replica was loaded
+        """
+        if self.mock:
+            return False
+        
+        try:
+            docs = []
+            # list() pages through the IDs (serverless indexes only)
+            for ids in self.index.list():
+                fetched = self.index.fetch(ids=list(ids)).vectors
+                for doc_id in ids:
+                    if doc_id in fetched:
+                        docs.append({
+                            "id": doc_id,
+                            "vector": np.asarray(fetched[doc_id].values, dtype=np.float32),
+                            "metadata": dict(fetched[doc_id].metadata or {})
+                        })
+            self.local_vectors = docs
+            self.local_vectors_version += 1
+            # Texts stored by add_document in earlier runs are known duplicates
+            self._content_ids.update(
+                (doc["metadata"]["content_hash"], doc["id"])
+                for doc in docs
+                if "content_hash" in doc["metadata"]
+            )
+            print(f"Loaded {len(docs)} vectors into the local replica")
+            return True
+        except Exception as e:
+            print(f"Error loading local replica: {str(e)}")
+            self.local_vectors = None
+            self.local_vectors_version += 1
+            return False
+    
+    @staticmethod
+    def _content_hash(text, metadata):
+        """Digest of a document's text and caller-supplied metadata, for deduplicating adds."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+        digest.update(json.dumps(metadata or {}, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
     
     def add_document(self, text, metadata=None):
         """
         Add a document to the vector database.
         
+        A text already added by this handler (or found in the local replica)
+        with the same metadata is not stored again; its existing ID is returned.
+        
         Args:
             text (str): Document text
             metadata (dict, optional): Document metadata
@@ -156,42 +477,141 @@ class RAGHandler:
         Returns:
             str: Document ID
         """
+        # Work on a copy: the caller's dict keeps hashing the same and is not
+        # aliased by the stored document
+        metadata = dict(metadata or {})
+        content_hash = self._content_hash(text, metadata)
+        if content_hash in self._content_ids:
+            return self._content_ids[content_hash]
+        
         doc_id = str(uuid.uuid4())
         vector = self.embed_text(text)
         
-        if metadata is None:
-            metadata = {}
-        
-        metadata["text"] = text
+        pack_text_metadata(metadata, text)
+        metadata["content_hash"] = content_hash
         
         if not self.mock:
-            self.index.upsert([(doc_id, vector, metadata)])
+            # Pinecone takes plain lists; convert only here
+            self.index.upsert([(doc_id, vector.tolist(), metadata)])
+            if self.local_vectors is not None:
+                self.local_vectors.append({"id": doc_id, "vector": vector, "metadata": metadata})
+                self.local_vectors_version += 1
         else:
-            self.mock_vectors.append({
+            doc = {
                 "id": doc_id,
                 "vector": vector,
                 "metadata": metadata
-            })
+            }
+            self.mock_vectors.append(doc)
+            if self._mock_index is not None:
+                self._index_mock_docs([doc])
         
+        self._content_ids[content_hash] = doc_id
+        self.answer_cache.clear()
+        self._documents_cache = None
         return doc_id
     
-    def search(self, query, top_k=5):
+    def add_documents(self, chunks, metadatas=None, batch_size=100):
+        """
+        Add several documents to the vector database in batches.
+        
+        Chunks that already carry an embedding (as returned by
+        DocumentProcessor.process_document) are not embedded again. As in
+        add_document, a chunk whose text and metadata were already added is not
+        stored again; its existing ID is returned.
+        
+        Args:
+            chunks (list): Texts, or dicts with "text" and optional "id", "embedding" (list or array) and "metadata"
+            metadatas (list, optional): Metadata for each plain-text chunk
+            batch_size (int, optional): Number of vectors per Pinecone upsert
+            
+        Returns:
+            list: Document IDs
+        """
+        if chunks and isinstance(chunks[0], str):
+            chunks = [
+                {"text": text, "metadata": metadata}
+                for text, metadata in zip(chunks, metadatas or [None] * len(chunks))
+            ]
+        
+        hashes = [self._content_hash(chunk["text"], chunk.get("metadata")) for chunk in chunks]
+        # First chunk of each content not stored yet
+        new_positions = {}
+        for i, content_hash in enumerate(hashes):
+            if content_hash not in self._content_ids:
+                new_positions.setdefault(content_hash, i)
+        if not new_positions:
+            return [self._content_ids[content_hash] for content_hash in hashes]
+        chunks = [chunks[i] for i in new_positions.values()]
+        
+        vectors = [chunk.get("embedding") for chunk in chunks]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self.embed_texts([chunks[i]["text"] for i in missing])
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+        
+        records = []
+        for chunk, vector, content_hash in zip(chunks, vectors, new_positions):
+            metadata = pack_text_metadata(dict(chunk.get("metadata") or {}), chunk["text"])
+            metadata["content_hash"] = content_hash
+            records.append((chunk.get("id") or str(uuid.uuid4()), vector, metadata))
+        
+        if not self.mock:
+            # Pinecone takes plain lists; embeddings stay arrays until here
+            batches = [
+                [
+                    (doc_id, np.asarray(vector, dtype=np.float32).tolist(), metadata)
+                    for doc_id, vector, metadata in records[start:start + batch_size]
+                ]
+                for start in range(0, len(records), batch_size)
+            ]
+            # Each upsert is a network round trip; send them all as async gRPC
+            # calls and wait at the end, so result() re-raises any failure
+            futures = [self.index.upsert(vectors=batch, async_req=True) for batch in batches]
+            for future in futures:
+                future.result()
+            if self.local_vectors is not None:
+                self.local_vectors.extend(
+                    {"id": doc_id, "vector": vector, "metadata": metadata}
+                    for doc_id, vector, metadata in records
+                )
+                self.local_vectors_version += 1
+        else:
+            docs = [
+                {"id": doc_id, "vector": vector, "metadata": metadata}
+                for doc_id, vector, metadata in records
+            ]
+            self.mock_vectors.extend(docs)
+            if self._mock_index is not None:
+                self._index_mock_docs(docs)
+        
+        for content_hash, (doc_id, _, _) in zip(new_positions, records):
+            self._content_ids[content_hash] = doc_id
+        self.answer_cache.clear()
+        self._documents_cache = None
+        return [self._content_ids[content_hash] for content_hash in hashes]
+    
+    def search(self, query, top_k=5, query_vector=None):
         """
         Search for similar documents.
         
         Args:
             query (str): Search query
             top_k (int, optional): Number of results to return
+            query_vector (list or np.ndarray, optional): Precomputed embedding of the query
             
         Returns:
             list: Similar documents
         """
-        query_vector = self.embed_text(query)
+        if query_vector is None:
+            query_vector = self.embed_text(query)
         
         if not self.mock:
             try:
                 results = self.index.query(
-                    vector=query_vector,
+                    # The client takes plain lists; convert only here
+                    vector=query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector,
                     top_k=top_k,
                     include_metadata=True
                 )
@@ -199,14 +619,7 @@ class RAGHandler:
                 # Handle the new Pinecone response format
                 matches = results.matches if hasattr(results, 'matches') else results.get('matches', [])
                 
-                return [
-                    {
-                        "id": match.id if hasattr(match, 'id') else match.get('id', ''),
-                        "score": match.score if hasattr(match, 'score') else match.get('score', 0),
-                        "metadata": match.metadata if hasattr(match, 'metadata') else match.get('metadata', {})
-                    }
-                    for match in matches
-                ]
+                return [_as_dict(match) for match in matches]
             except Exception as e:
                 print(f"Error querying Pinecone: {str(e)}")
                 # Fall back to mock search if Pinecone query fails
@@ -225,36 +638,51 @@ class RAGHandler:
         Returns:
             list: Similar documents
         """
-        # Calculate cosine similarity
-        similarities = []
+        # Non-mock handlers reach here only as a fallback and have no mock store
+        if not getattr(self, "mock_vectors", None) or top_k <= 0:
+            return []
         
-        for doc in self.mock_vectors:
-            similarity = self._cosine_similarity(query_vector, doc["vector"])
-            similarities.append((doc, similarity))
+        if self._mock_index is None:
+            dimension = len(self.mock_vectors[0]["vector"])
+            if self.quantize:
+                # One byte per dimension over [-1, 1], the range of a unit vector's
+                # components; training on the two corners fixes that range
+                quantizer = faiss.IndexScalarQuantizer(
+                    dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_INNER_PRODUCT
+                )
+                quantizer.train(np.array([[-1.0] * dimension, [1.0] * dimension], dtype=np.float32))
+            else:
+                quantizer = faiss.IndexFlatIP(dimension)
+            self._mock_index = faiss.IndexIDMap2(quantizer)
+            self._index_mock_docs(self.mock_vectors)
+        if self._mock_index.ntotal == 0:
+            return []
         
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Inner product of L2-normalized vectors is cosine similarity
+        query = np.array([query_vector], dtype=np.float32)
+        faiss.normalize_L2(query)
+        scores, faiss_ids = self._mock_index.search(query, min(top_k, self._mock_index.ntotal))
         
-        # Return top_k results
         return [
             {
-                "id": doc["id"],
-                "score": score,
-                "metadata": doc["metadata"]
+                "id": self._mock_index_docs[faiss_id]["id"],
+                "score": float(score),
+                "metadata": self._mock_index_docs[faiss_id]["metadata"]
             }
-            for doc, score in similarities[:top_k]
-            ]
+            for score, faiss_id in zip(scores[0], faiss_ids[0])
+            if faiss_id >= 0
+        ]
     
-    def _cosine_similarity(self, vec1, vec2):
-        """Calculate cosine similarity between two vectors."""
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm_vec1 = np.linalg.norm(vec1)
-        norm_vec2 = np.linalg.norm(vec2)
-        
-        return dot_product / (norm_vec1 * norm_vec2)
+    def _index_mock_docs(self, docs):
+        """Add mock documents to the FAISS index under fresh integer IDs."""
+        if not docs:
+            return
+        vectors = np.asarray([doc["vector"] for doc in docs], dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        faiss_ids = np.arange(self._next_mock_index_id, self._next_mock_index_id + len(docs), dtype=np.int64)
+        self._mock_index.add_with_ids(vectors, faiss_ids)
+        self._mock_index_docs.update(zip(faiss_ids.tolist(), docs))
+        self._next_mock_index_id += len(docs)
     
     def delete_document(self, doc_id):
         """
@@ -268,9 +696,25 @@ class RAGHandler:
         """
         if not self.mock:
             self.index.delete(ids=[doc_id])
+            if self.local_vectors is not None:
+                self.local_vectors = [doc for doc in self.local_vectors if doc["id"] != doc_id]
+                self.local_vectors_version += 1
         else:
             self.mock_vectors = [doc for doc in self.mock_vectors if doc["id"] != doc_id]
+            if self._mock_index is not None:
+                removed = [faiss_id for faiss_id, doc in self._mock_index_docs.items() if doc["id"] == doc_id]
+                if removed:
+                    self._mock_index.remove_ids(np.asarray(removed, dtype=np.int64))
+                    for faiss_id in removed:
+                        del self._mock_index_docs[faiss_id]
         
+        self._content_ids = {
+            content_hash: stored_id
+            for content_hash, stored_id in self._content_ids.items()
+            if stored_id != doc_id
+        }
+        self.answer_cache.clear()
+        self._documents_cache = None
         return True
     
     def get_answer(self, query):
@@ -283,8 +727,14 @@ class RAGHandler:
         Returns:
             dict: Answer with sources
         """
+        # A near-identical recent question skips retrieval and generation
+        query_vector = self.embed_text(query)
+        cached = self.answer_cache.get(query_vector)
+        if cached is not None:
+            return cached
+        
         # Search for relevant documents
-        results = self.search(query, top_k=3)
+        results = self.search(query, top_k=3, query_vector=query_vector)
         
         if not results:
             return {
@@ -292,6 +742,9 @@ class RAGHandler:
                 "sources": []
             }
         
+        # Chunk text lives in the match metadata
+        results = [{**result, "text": text_from_metadata(result.get("metadata") or {})} for result in results]
+        
         # Construct context from results
         context = "\n\n".join([result["text"] for result in results])
         
@@ -299,33 +752,83 @@ class RAGHandler:
         # In a real implementation, this would use an LLM like OpenAI's GPT
         answer = self._generate_mock_answer(query, context, results)
         
-        return {
+        response = {
             "answer": answer,
             "sources": results
         }
+        self.answer_cache.put(query_vector, response)
+        return response
     
     def _generate_mock_answer(self, query, context, results):
         """Generate a mock answer based on the context."""
-        query_lower = query.lower()
+        topics = {_QUERY_KEYWORD_TOPIC[keyword] for keyword in _QUERY_KEYWORD_RE.findall(query.lower())}
         
-        # Check for specific query types
-        if "abc analysis" in query_lower:
-            return results[0]["text"] if any("abc analysis" in result["text"].lower() for result in results) else "ABC Analysis is an inventory categorization method which consists of dividing items into three categories: A, B, and C based on their value and sales frequency."
+        # Check for specific query types, first topic wins
+        if topics:
+            topic = min(topics)
+            keyword_re = _TEXT_KEYWORD_RES[topic]
+            if any(keyword_re.search(result["text"]) for result in results):
+                return results[0]["text"]
+            return MOCK_ANSWER_KEYWORDS[topic][2]
+        
+        # Default response based on the most relevant result
+        return results[0]["text"] if results else "I don't have enough information to answer that question."
+    
+    def get_all_documents_df(self):
+        """
+        Retrieve all uploaded documents as a DataFrame for display.
         
-        if "jit" in query_lower or "just in time" in query_lower:
-            return results[0]["text"] if any("jit" in result["text"].lower() or "just-in-time" in result["text"].lower() for result in results) else "Just-in-Time (JIT) inventory management is a strategy that aligns raw-material orders from suppliers directly with production schedules to reduce waste and inventory costs."
+        Returns:
+            pd.DataFrame: One row per document with fixed string columns
+        """
+        return pd.DataFrame.from_records(
+            self.get_all_documents(),
+            columns=["id", "name", "type", "uploaded", "size", "text_preview"]
+        ).astype("string")
+    
+    def _iter_metadata(self, total_vectors):
+        """
+        Yield (id, metadata) for every vector in the Pinecone index.
         
-        if "eoq" in query_lower or "economic order quantity" in query_lower:
-            return results[0]["text"] if any("eoq" in result["text"].lower() or "economic order quantity" in result["text"].lower() for result in results) else "Economic Order Quantity (EOQ) is the order quantity that minimizes the total holding costs and ordering costs."
+        Pages through the IDs with list() and fetches the pages concurrently as
+        async gRPC calls. Indexes without
+        ID listing (pod-based) fall back to a placeholder-vector query, which
+        returns at most 1000 matches with metadata.
         
-        if "fifo" in query_lower or "first in first out" in query_lower:
-            return results[0]["text"] if any("fifo" in result["text"].lower() or "first-in, first-out" in result["text"].lower() for result in results) else "First-In, First-Out (FIFO) is an asset-management method in which assets produced or acquired first are sold, used, or disposed of first."
+        Args:
+            total_vectors (int): Vector count from describe_index_stats
+        """
+        try:
+            pages = self.index.list()
+            first_page = next(pages, None)
+        except Exception:
+            first_page = pages = None
         
-        if "safety stock" in query_lower:
-            return results[0]["text"] if any("safety stock" in result["text"].lower() for result in results) else "Safety stock is a level of extra stock that is maintained to mitigate risk of stockouts caused by uncertainties in supply and demand."
+        if pages is not None:
+            # Keep up to FETCH_WINDOW page fetches in flight; each response also
+            # carries the vector values, so memory stays bounded by the window
+            in_flight = deque()
+            page = first_page
+            while page is not None or in_flight:
+                while page is not None and len(in_flight) < FETCH_WINDOW:
+                    page = list(page)
+                    in_flight.append((page, self.index.fetch(ids=page, async_req=True)))
+                    page = next(pages, None)
+                done_page, future = in_flight.popleft()
+                fetched = future.result().vectors
+                for doc_id in done_page:
+                    if doc_id in fetched:
+                        yield doc_id, getattr(fetched[doc_id], 'metadata', None)
+            return
         
-        # Default response based on the most relevant result
-        return results[0]["text"] if results else "I don't have enough information to answer that question."
+        results = self.index.query(
+            vector=_ZERO_VEC,
+            top_k=min(total_vectors, 1000),  # Pinecone's limit when returning metadata
+            include_metadata=True
+        )
+        matches = results.matches if hasattr(results, 'matches') else results.get('matches', [])
+        for match in map(_as_dict, matches):
+            yield match["id"], match["metadata"]
     
     def get_all_documents(self):
         """
@@ -343,44 +846,31 @@ class RAGHandler:
                 if total_vectors == 0:
                     return []
                 
-                # Query with a dummy vector to get all documents
-                # This is a workaround since Pinecone doesn't have a direct "list all" method
-                dummy_vector = [0.0] * 384  # Match the embedding dimension
+                cached = self._documents_cache
+                if cached is not None and cached[0] == total_vectors:
+                    return [dict(doc) for doc in cached[1]]
                 
-                # Query with a high top_k to get all documents
-                results = self.index.query(
-                    vector=dummy_vector,
-                    top_k=min(total_vectors, 10000),  # Limit to prevent excessive results
-                    include_metadata=True
-                )
-                
-                documents = []
-                matches = results.matches if hasattr(results, 'matches') else results.get('matches', [])
-                
-                for match in matches:
-                    metadata = match.metadata if hasattr(match, 'metadata') else match.get('metadata', {})
-                    doc_id = match.id if hasattr(match, 'id') else match.get('id', '')
+                # One entry per file name, keeping the first chunk seen
+                documents = {}
+                for doc_id, metadata in self._iter_metadata(total_vectors):
+                    metadata = metadata or {}
+                    name = metadata.get('file_name', 'Unknown Document')
+                    if name in documents:
+                        continue
+                    text = metadata.get('text') or ''
                     
                     # Extract document information from metadata
-                    doc_info = {
+                    documents[name] = {
                         "id": doc_id,
-                        "name": metadata.get('file_name', 'Unknown Document'),
+                        "name": name,
                         "type": metadata.get('file_type', 'Unknown'),
                         "uploaded": metadata.get('upload_date', 'Unknown'),
                         "size": metadata.get('file_size', 'Unknown'),
-                        "text_preview": metadata.get('text', '')[:100] + "..." if metadata.get('text', '') else ""
+                        "text_preview": text[:100] + "..." if text else ""
                     }
-                    documents.append(doc_info)
-                
-                # Remove duplicates based on file name
-                seen_names = set()
-                unique_documents = []
-                for doc in documents:
-                    if doc['name'] not in seen_names:
-                        seen_names.add(doc['name'])
-                        unique_documents.append(doc)
                 
-                return unique_documents
+                self._documents_cache = (total_vectors, list(documents.values()))
+                return [dict(doc) for doc in self._documents_cache[1]]
                 
             except Exception as e:
                 print(f"Error retrieving documents from Pinecone: {str(e)}")
@@ -46,6 +46,24 @@ def test_document_upload():
         print(f"❌ Failed to upload document: {e}")
         return
     
+    # Upload a batch of chunks through the bulk path
+    try:
+        print("\n📤 Uploading test batch...")
+        doc_ids = rag_handler.add_documents([
+            {
+                "text": "Safety stock is extra inventory held to protect against variability in demand and supplier lead times.",
+                "metadata": {"file_name": "test_batch.txt", "chunk_index": 0, "topic": "safety stock"}
+            },
+            {
+                "text": "Economic order quantity balances ordering costs against holding costs to find the most cost-effective order size.",
+                "metadata": {"file_name": "test_batch.txt", "chunk_index": 1, "topic": "economic order quantity"}
+            }
+        ])
+        print(f"✅ Batch uploaded with IDs: {', '.join(doc_ids)}")
+    except Exception as e:
+        print(f"❌ Failed to upload batch: {e}")
+        return
+    
     # Test search
     try:
         print("\n🔍 Testing search functionality...")
@@ -0,0 +1,58 @@
+import unittest
+
+from database.db_handler import DatabaseHandler
+from models.inventory import InventoryManager
+
+
+class CalculateEoqBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = InventoryManager(DatabaseHandler())
+
+    def test_matches_scalar_calculation(self):
+        results = self.manager.calculate_eoq_batch(["P001", "P002"], [1000, 5000], 25.0, [5.0, 2.0])
+        for result, (product_id, demand, holding) in zip(results, [("P001", 1000, 5.0), ("P002", 5000, 2.0)]):
+            self.assertEqual(result, self.manager.calculate_eoq(product_id, demand, 25.0, holding))
+
+    def test_zero_demand_gives_empty_result(self):
+        result, valid = self.manager.calculate_eoq_batch(["P001", "P002"], [0, 1000], 25.0, 5.0)
+        self.assertIsNone(result["eoq"])
+        self.assertIsNone(result["total_cost"])
+        self.assertEqual(valid["eoq"], 100)
+
+    def test_zero_holding_cost_gives_empty_result(self):
+        result, valid = self.manager.calculate_eoq_batch(["P001", "P002"], [1000, 1000], 25.0, [0.0, 5.0])
+        self.assertIsNone(result["eoq"])
+        self.assertIsNone(result["optimal_orders"])
+        self.assertEqual(valid["eoq"], 100)
+
+
+class CalculateSafetyStockBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.db = DatabaseHandler()
+        self.manager = InventoryManager(self.db)
+
+    def test_updates_inventory_in_one_bulk_write(self):
+        calls = []
+        bulk_write = self.db.bulk_write
+        self.db.bulk_write = lambda name, updates: calls.append(len(updates)) or bulk_write(name, updates)
+        results = self.manager.calculate_safety_stock_batch(["P001", "P002"], [10, 20], 2.0, 5.0, 1.0)
+        self.assertEqual(calls, [2])
+        for result in results:
+            stored = self.db.find_one("inventory", {"product_id": result["product_id"]})
+            self.assertEqual(stored["safety_stock"], result["safety_stock"])
+            self.assertEqual(stored["reorder_point"], result["reorder_point"])
+
+    def test_zero_demand_is_finite(self):
+        result, = self.manager.calculate_safety_stock_batch(["P001"], [0], 0.0, 5.0, 1.0)
+        self.assertEqual(result["safety_stock"], 0)
+        self.assertEqual(result["reorder_point"], 0)
+
+    def test_invalid_inputs_are_skipped(self):
+        before = dict(self.db.find_one("inventory", {"product_id": "P001"}))
+        result, = self.manager.calculate_safety_stock_batch(["P001"], [10], 2.0, [-50.0], 1.0)
+        self.assertIsNone(result["safety_stock"])
+        self.assertEqual(self.db.find_one("inventory", {"product_id": "P001"}), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from rag.rag_handler import RAGHandler
+
+
+class AddDocumentTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.handler = RAGHandler(mock=True)
+
+    def test_reused_metadata_dict_is_deduplicated(self):
+        metadata = {"file_name": "reused.txt"}
+        doc_id = self.handler.add_document("Lead time is the delay between ordering and receiving stock.", metadata)
+        count = len(self.handler.mock_vectors)
+        self.assertEqual(
+            self.handler.add_document("Lead time is the delay between ordering and receiving stock.", metadata),
+            doc_id
+        )
+        self.assertEqual(len(self.handler.mock_vectors), count)
+        self.assertEqual(metadata, {"file_name": "reused.txt"})
+
+    def test_different_metadata_is_stored_separately(self):
+        first = self.handler.add_document("Cycle counting audits a subset of inventory.", {"file_name": "a.txt"})
+        second = self.handler.add_document("Cycle counting audits a subset of inventory.", {"file_name": "b.txt"})
+        self.assertNotEqual(first, second)
+
+
+class AnswerCacheTest(unittest.TestCase):
+    def test_mutating_an_answer_leaves_the_cache_intact(self):
+        handler = RAGHandler(mock=True)
+        first = handler.get_answer("What is safety stock?")
+        sources = len(first["sources"])
+        first["sources"].append({"id": "extra"})
+        second = handler.get_answer("What is safety stock?")
+        self.assertEqual(len(second["sources"]), sources)
+        second["sources"].clear()
+        self.assertEqual(len(handler.get_answer("What is safety stock?")["sources"]), sources)
+
+
+if __name__ == "__main__":
+    unittest.main()